@@ -0,0 +1,97 @@
+"""
+bench_import.py
+
+Cold-start cost of raincloud_modern for short-lived processes
+
+Every scenario runs in a fresh interpreter, so nothing is cached in
+``sys.modules``:
+
+- import: ``import raincloud_modern`` alone
+- eager import: the module after importing the dependencies it used to load
+  at import time (pandas, seaborn, scipy.stats, scipy.fft, pyplot)
+- first plot: the import followed by one small RainCloud saved to PNG
+
+The import and plot times are measured inside the child, leaving out
+interpreter start-up. Results are printed as a table, e.g.::
+
+    python benchmarks/bench_import.py --repeat 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+# Dependencies that raincloud_modern imported eagerly before they became lazy
+HEAVY_MODULES = ("pandas", "seaborn", "scipy.stats", "scipy.fft", "matplotlib.pyplot")
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+import raincloud_modern
+imported = time.perf_counter()
+if {plot!r}:
+    import io
+    import matplotlib
+    matplotlib.use("Agg")
+    import numpy as np
+    data = {{"group": np.repeat(["A", "B"], 100), "value": np.random.default_rng(0).normal(size=200)}}
+    ax = raincloud_modern.RainCloud(x="group", y="value", data=data, random_state=0)
+    ax.figure.savefig(io.BytesIO(), format="png")
+done = time.perf_counter()
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps(dict(import_s=imported - start, plot_s=done - imported, loaded=loaded)))
+"""
+
+SCENARIOS = {
+    "import": dict(preload=(), plot=False),
+    "eager import": dict(preload=HEAVY_MODULES, plot=False),
+    "first plot": dict(preload=(), plot=True),
+    "eager first plot": dict(preload=HEAVY_MODULES, plot=True),
+}
+
+
+def run_child(preload, plot):
+    """
+    Run one scenario in a fresh interpreter, returning its timings
+    """
+    code = CHILD.format(root=ROOT, preload=tuple(preload), plot=plot, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timings keep the median of this many runs")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.scenarios:
+        runs = [run_child(**SCENARIOS[name]) for _ in range(args.repeat)]
+        frame = pd.DataFrame(runs)
+        results.append(
+            dict(
+                scenario=name,
+                import_s=frame["import_s"].median(),
+                plot_s=frame["plot_s"].median() if SCENARIOS[name]["plot"] else float("nan"),
+                loaded=", ".join(runs[0]["loaded"]) or "-",
+            )
+        )
+        print(f"done {name}", file=sys.stderr, flush=True)
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False, float_format="%.3f"))
+    return results
+
+
+if __name__ == "__main__":
+    main()
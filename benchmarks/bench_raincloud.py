@@ -0,0 +1,191 @@
+"""
+bench_raincloud.py
+
+Benchmark sweep of RainCloud over data sizes, category and hue counts
+
+Every configuration is timed in three phases:
+
+- stats: partitioning and all cell statistics (densities, boxes, means)
+- render: creating the artists, with the statistics served from the cache
+- savefig: rasterizing the figure to PNG
+
+Peak memory is measured per phase in a separate run under tracemalloc, which
+would otherwise slow down the timings. ``--compact both`` runs every
+configuration with and without ``compact=True`` and reports the reduction of
+peak memory in the stats phase. Results are printed as a table and optionally
+written to CSV, e.g.::
+
+    python benchmarks/bench_raincloud.py --rows 1e3 1e5 1e7 --categories 1 10 1000 --out bench.csv
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import raincloud_modern as rc  # noqa: E402
+
+
+def make_data(n_rows, n_categories, n_hue, seed=0):
+    """
+    Long-form data with normal groups of shifted means
+    """
+    rng = np.random.default_rng(seed)
+    categories = rng.integers(0, n_categories, n_rows)
+    hues = rng.integers(0, n_hue, n_rows)
+    return pd.DataFrame(
+        {
+            "group": np.array([f"c{i}" for i in range(n_categories)])[categories],
+            "hue": np.array([f"h{i}" for i in range(n_hue)])[hues],
+            "value": rng.normal(size=n_rows) + 0.1 * categories + 0.5 * hues,
+        }
+    )
+
+
+class Timer:
+    """
+    Wall time of each phase, in seconds
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        yield
+        self.results[name] = time.perf_counter() - start
+
+
+class MemoryMeter:
+    """
+    Peak traced allocations of each phase, in MiB
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        tracemalloc.start()
+        try:
+            yield
+            self.results[name] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+
+
+def run_phases(data, options, meter):
+    """
+    Plot `data` phase by phase under `meter`, returning the number of artists
+    """
+    hue = "hue" if data["hue"].nunique() > 1 else None
+    categories = data["group"].unique()
+    hue_levels = [None] if hue is None else data["hue"].unique()
+
+    # Fill the statistics cache the way RainCloud looks it up
+    compact = options.get("compact", False)
+    rc.clear_stats_cache()
+    with meter.phase("stats"):
+        keys = rc._cell_keys(data, "group", categories, hue, hue_levels, compact)
+        rc._cell_statistics(
+            rc._value_column(data, "value", np.float32 if compact else float),
+            keys,
+            len(categories) * len(hue_levels),
+            options.get("bw", "scott"),
+            options.get("cut", 2),
+            options.get("kde_engine", "exact"),
+            matplotlib.rcParams["boxplot.whiskers"],
+            cache=True,
+            box_method=options.get("box_method", "exact"),
+            compact=compact,
+        )
+
+    fig, ax = plt.subplots(figsize=(max(6, len(categories) * 0.05), 4))
+    with meter.phase("render"):
+        rc.RainCloud(x="group", y="value", hue=hue, data=data, ax=ax, cache=True, random_state=0, **options)
+    if rc.stats_cache_info()["hits"] != 1:
+        raise RuntimeError("RainCloud recomputed the statistics; the render phase is not isolated")
+
+    with meter.phase("savefig"):
+        fig.savefig(io.BytesIO(), format="png", dpi=100)
+
+    n_artists = len(fig.findobj())
+    plt.close(fig)
+    return n_artists
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e3, 1e5, 1e6])
+    parser.add_argument("--categories", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--hue", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--pointplot", choices=["off", "on", "both"], default="both")
+    parser.add_argument("--compact", choices=["off", "on", "both"], default="off")
+    parser.add_argument("--render", nargs="+", default=["cells"], choices=rc.RENDER_MODES)
+    parser.add_argument("--kde-engine", default="exact", choices=rc.KDE_ENGINES)
+    parser.add_argument("--repeat", type=int, default=3, help="timings keep the best of this many runs")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--out", help="CSV file to write the results to")
+    args = parser.parse_args(argv)
+
+    switches = {"off": [False], "on": [True], "both": [False, True]}
+    results = []
+    for n_rows, n_categories, n_hue, point, render, compact in itertools.product(
+        args.rows, args.categories, args.hue, switches[args.pointplot], args.render, switches[args.compact]
+    ):
+        data = make_data(int(n_rows), n_categories, n_hue)
+        options = dict(
+            pointplot=point, connect_means=point, render=render, kde_engine=args.kde_engine, compact=compact
+        )
+
+        row = dict(
+            rows=int(n_rows), categories=n_categories, hue=n_hue, pointplot=point, render=render, compact=compact
+        )
+        timings = []
+        for _ in range(args.repeat):
+            gc.collect()
+            timer = Timer()
+            row["artists"] = run_phases(data, options, timer)
+            timings.append(timer.results)
+        row.update({f"{name}_s": min(t[name] for t in timings) for name in timings[0]})
+
+        if not args.no_memory:
+            gc.collect()
+            memory = MemoryMeter()
+            run_phases(data, options, memory)
+            row.update({f"{name}_mb": peak for name, peak in memory.results.items()})
+        results.append(row)
+        print(f"done {len(results)}: {row}", file=sys.stderr, flush=True)
+
+    results = pd.DataFrame(results)
+    if args.compact == "both" and "stats_mb" in results:
+        # Peak stats memory of the compact run relative to the default one
+        setup = ["rows", "categories", "hue", "pointplot", "render"]
+        default = results[~results["compact"]].set_index(setup)["stats_mb"]
+        results["stats_mb_ratio"] = results["stats_mb"].to_numpy() / default.loc[
+            pd.MultiIndex.from_frame(results[setup])
+        ].to_numpy()
+    print(results.to_string(index=False, float_format="%.4f"))
+    if args.out:
+        results.to_csv(args.out, index=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
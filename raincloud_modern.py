@@ -7,14 +7,92 @@ Created by Yuki Sakai
 
 from __future__ import division
 
+import contextlib
+import hashlib
+import importlib
+import os
+import shutil
+import time
+import traceback
 import warnings
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-import seaborn as sns
-from matplotlib.collections import PolyCollection
-from scipy import stats
+import matplotlib as mpl
+from matplotlib import cbook
+from matplotlib import colors as mcolors
+from matplotlib import lines as mlines
+from matplotlib import patches as mpatches
+from matplotlib import path as mpath
+from matplotlib import transforms as mtransforms
+from matplotlib.collections import LineCollection, PolyCollection
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access
+
+    Keeps ``import raincloud_modern`` fast for short-lived processes: pandas,
+    pyplot, seaborn and scipy are only loaded by the code paths using them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+pd = _LazyModule("pandas")
+plt = _LazyModule("matplotlib.pyplot")
+mfigure = _LazyModule("matplotlib.figure")
+backend_pdf = _LazyModule("matplotlib.backends.backend_pdf")
+sns = _LazyModule("seaborn")
+fft = _LazyModule("scipy.fft")
+stats = _LazyModule("scipy.stats")
+process = _LazyModule("concurrent.futures.process")
+shared_memory = _LazyModule("multiprocessing.shared_memory")
+
+
+# Density engines accepted by `kde_engine`
+KDE_ENGINES = ("exact", "binned", "fft")
+
+# Representations accepted by `rain_mode`
+RAIN_MODES = ("auto", "points", "raster", "subsample", "hexbin")
+
+# Artist layouts accepted by `render`
+RENDER_MODES = ("cells", "collections")
+
+# Ways of computing the box statistics
+BOX_METHODS = ("exact", "select", "sketch")
+
+# Intervals accepted by `ci` around the means of the point layer
+CI_METHODS = (None, "sem", "bootstrap")
+
+# Per-group box statistics computed by `_box_stats`
+_BOX_STAT_KEYS = ("mean", "med", "q1", "q3", "iqr", "cilo", "cihi", "whislo", "whishi")
+
+# Box keyword arguments that need the raw data and therefore `Axes.boxplot`
+_BOXPLOT_ONLY_KWARGS = {"sym", "bootstrap", "usermedians", "conf_intervals", "autorange", "labels", "tick_labels"}
+
+# Box keyword arguments understood by the consolidated box collections
+_BOX_COLLECTION_KWARGS = {
+    "saturation",
+    "whis",
+    "boxprops",
+    "flierprops",
+    "whiskerprops",
+    "capprops",
+    "medianprops",
+    "showfliers",
+    "showcaps",
+}
 
 
 def RainCloud(
@@ -44,6 +122,24 @@ def RainCloud(
     alpha=0.5,
     cut=2,
     linewidth=1,
+    kde_engine="exact",
+    rain_mode="auto",
+    rain_threshold=100_000,
+    render="cells",
+    cache=False,
+    summary=None,
+    box_method="exact",
+    max_fliers=None,
+    n_jobs=None,
+    return_handle=False,
+    random_state=None,
+    gridsize=100,
+    weights=None,
+    compact=False,
+    ci=None,
+    n_boot=1000,
+    ci_level=95,
+    seed=None,
     **kwargs,
 ):
     """
@@ -55,8 +151,9 @@ def RainCloud(
         Inputs for plotting long-form data.
     hue : name of variable in `data`
         Grouping variable that will produce points with different colors.
-    data : DataFrame
-        Long-form (tidy) dataset for plotting.
+    data : DataFrame, dict of arrays, structured array, pyarrow or Polars table
+        Long-form (tidy) dataset for plotting. Columns are read as NumPy
+        arrays, without copying where the layout allows.
     order, hue_order : lists of strings
         Order to plot the categorical levels in.
     palette : list or dict of colors
@@ -85,8 +182,10 @@ def RainCloud(
         Color for the line connecting the means.
     point_size : float
         Size of the points in the strip plot.
-    jitter : bool or float
-        Amount of jitter to add to the strip plot.
+    jitter : bool or float or "density"
+        Amount of jitter to add to the strip plot. "density" scales each
+        point's jitter by the relative density of the violin at its value,
+        so the rain follows the outline of the cloud like a light beeswarm.
     dodge : bool
         Whether to dodge when hue is used.
     scale : "area" or "count" or "width"
@@ -99,24 +198,167 @@ def RainCloud(
         How far to extend the density past the extreme datapoints.
     linewidth : float
         Width of the lines.
+    kde_engine : "exact" or "binned" or "fft"
+        How the violin densities are computed. "exact" sums the Gaussian
+        kernels at every grid point, matching scipy's gaussian_kde, for all
+        groups in one vectorized pass; "binned" and "fft" linearly
+        bin the data and convolve with the kernel, which is much faster for
+        large groups and stays within a documented error bound of the exact
+        estimate (see `_kde_binned`).
+    rain_mode : "auto" or "points" or "raster" or "subsample" or "hexbin"
+        How the rain is drawn. "points" draws one vector marker per
+        observation; "raster" embeds the markers as a bitmap in vector outputs;
+        "subsample" draws at most `rain_threshold` points in total, shared
+        between groups in proportion to their size; "hexbin" aggregates each
+        group into a hexagonal density image. "auto" uses "points" up to
+        `rain_threshold` observations and a rasterized "subsample" above it.
+        Violins and boxes are always drawn as vectors.
+    rain_threshold : int
+        Number of observations above which the rain is reduced.
+    render : "cells" or "collections"
+        Artist layout. "cells" adds separate violin, rain and box artists for
+        every (category, hue) cell; "collections" draws each layer of all
+        cells into a few shared artists (one PolyCollection of violins, one
+        rain scatter per hue level, one set of box collections), which looks
+        the same and draws much faster when there are many cells.
+    cache : bool
+        Whether to reuse the cell statistics (densities, box statistics and
+        means) of an earlier call on the same values, grouping and density
+        parameters, so that restyling a plot skips all numerical work. The
+        cache is a bounded LRU, see `set_stats_cache_size` and
+        `clear_stats_cache`.
+    summary : DataFrame
+        Precomputed per-cell statistics to plot instead of `data`, one row
+        per (category, hue) cell, in the format returned by
+        `summarize_raincloud`. Only the categorical and hue columns are
+        looked up by name; the value variable may be omitted.
+    box_method : "exact" or "select" or "sketch"
+        How the box statistics are computed. "exact" sorts every group, like
+        `Axes.boxplot`; "select" finds the same quartiles by partial
+        selection without a full sort, which is faster for very large groups;
+        "sketch" estimates them from a bounded-memory quantile sketch (rank
+        error well below 1%). Whiskers and fliers are exact for the given
+        quartiles.
+    max_fliers : int
+        Largest number of fliers drawn per box. Larger sets are thinned to
+        evenly spaced order statistics, always keeping the extremes.
+    n_jobs : int
+        Number of threads computing the cell statistics (-1 for one per
+        CPU). The result is identical to the serial computation; drawing
+        always happens on the calling thread.
+    return_handle : bool
+        Whether to return a `RainCloudHandle` that can update individual
+        cells in place, instead of the axis. Needs raw `data` and
+        ``render="cells"``.
+    random_state : int or numpy.random.Generator
+        Seed or generator for the rain jitter and subsampling, so that the
+        same input always gives identical pixels. By default NumPy's global
+        random state is used.
+    gridsize : int or "auto"
+        Number of points at which each density is evaluated. "auto" picks
+        it from the pixel height of the axis at the figure (or larger
+        savefig) dpi, keeps value limits the caller fixed on `ax` (not
+        those left by an earlier RainCloud call) and only evaluates the
+        densities within them, and drops violin vertices that are
+        collinear to within a fraction of a pixel.
+    weights : name of variable in `data`
+        Frequency weights: each row stands for this many observations, so
+        aggregated ``(value, count)`` data plot like the expanded rows. The
+        densities, quartiles, means and standard errors are weighted, and
+        the rain shows a sample of at most `rain_threshold` of the
+        represented observations, drawn in proportion to the weights.
+    compact : bool
+        Whether to compute the statistics on compact buffers: the values are
+        converted once to float32 and the category and hue columns to the
+        smallest integer codes, rows are sorted into cells in blocks, and
+        exact box statistics are found cell by cell by selection. This cuts
+        peak memory for large data to about the size of the float32 values;
+        results agree with the default path to float32 precision (about 7
+        significant digits).
+    ci : None or "sem" or "bootstrap"
+        Error bars around the means of the point layer. "sem" spans one
+        standard error on either side; "bootstrap" is the percentile
+        bootstrap confidence interval of the mean, computed for all cells
+        together by a vectorized resampling engine with bounded memory (see
+        `_bootstrap_intervals`). Error bar options take the prefix ``ci_``,
+        e.g. ``ci_capsize=2``.
+    n_boot : int
+        Number of bootstrap resamples.
+    ci_level : float
+        Confidence level of the bootstrap interval, in percent.
+    seed : int or numpy.random.Generator
+        Seed or generator for the bootstrap resamples, independent of
+        `random_state` so that adding the intervals leaves the rain as is.
     **kwargs : dict
         Other keyword arguments to pass to underlying functions.
 
     Returns
     -------
     ax : matplotlib axis
-        Axis with the raincloud plot.
+        Axis with the raincloud plot, or a `RainCloudHandle` holding it.
     """
+    # Time the phases for `profile_raincloud`, if active
+    laps = _Laps()
+
     # Validate orientation
     if orient not in ["v"]:
         raise ValueError("Only vertical orientation 'v' is supported.")
 
+    # Validate the rain mode
+    if rain_mode not in RAIN_MODES:
+        raise ValueError(f"`rain_mode` must be one of {RAIN_MODES}, got {rain_mode!r}")
+
+    # Validate the artist layout
+    if render not in RENDER_MODES:
+        raise ValueError(f"`render` must be one of {RENDER_MODES}, got {render!r}")
+
+    # Validate the density engine
+    if kde_engine not in KDE_ENGINES:
+        raise ValueError(f"`kde_engine` must be one of {KDE_ENGINES}, got {kde_engine!r}")
+
+    # Validate the box statistics
+    if box_method not in BOX_METHODS:
+        raise ValueError(f"`box_method` must be one of {BOX_METHODS}, got {box_method!r}")
+
+    # Validate the density grid
+    if gridsize != "auto" and not (isinstance(gridsize, (int, np.integer)) and gridsize >= 2):
+        raise ValueError(f"`gridsize` must be 'auto' or an integer of at least 2, got {gridsize!r}")
+
+    # Validate the error bars
+    if ci not in CI_METHODS:
+        raise ValueError(f"`ci` must be one of {CI_METHODS}, got {ci!r}")
+    if ci == "bootstrap" and not (isinstance(n_boot, (int, np.integer)) and n_boot >= 1 and 0 < ci_level < 100):
+        raise ValueError(
+            f"`n_boot` must be a positive integer and `ci_level` within (0, 100), got {n_boot!r}, {ci_level!r}"
+        )
+
+    # Live handles keep one set of artists per cell
+    if return_handle and (render != "cells" or summary is not None or weights is not None or ci is not None):
+        raise ValueError("`return_handle` needs raw, unweighted `data`, render='cells' and no `ci`")
+
+    # Resampling needs the raw rows
+    if ci == "bootstrap" and summary is not None:
+        raise ValueError("`ci='bootstrap'` cannot be combined with `summary`")
+
+    # Weights describe raw rows
+    if weights is not None and summary is not None:
+        raise ValueError("`weights` cannot be combined with `summary`")
+
     # Create axis if none is provided
     if ax is None:
         if figsize is None:
             figsize = (8, 6)
         fig, ax = plt.subplots(figsize=figsize)
 
+    # Resolve the density grid from the axis; fixed limits bound the evaluation
+    value_range = None
+    n_points = gridsize
+    if gridsize == "auto":
+        # Limits left by an earlier RainCloud on this axis do not count as fixed
+        if not ax.get_autoscaley_on() and _own_limits.get(ax) != ax.get_ylim():
+            value_range = tuple(sorted(ax.get_ylim()))
+        n_points = _auto_gridsize(ax, clipped=value_range is not None)
+
     # Set default offset if not provided
     if offset is None:
         offset = max(width_box / 1.8, 0.15) + 0.05
@@ -129,6 +371,7 @@ def RainCloud(
     kwbox = dict(saturation=1)  # Removed whiskerprops from default to avoid overriding
     kwrain = dict(zorder=0, edgecolor="white")
     kwpoint = dict()  # Simplified to avoid parameter issues
+    kwci = dict(elinewidth=linewidth)
 
     for key, value in kwargs.items():
         if "cloud_" in key:
@@ -139,6 +382,8 @@ def RainCloud(
             kwrain[key.replace("rain_", "")] = value
         elif "point_" in key:
             kwpoint[key.replace("point_", "")] = value
+        elif "ci_" in key:
+            kwci[key.replace("ci_", "")] = value
 
     # Extract parameters for rain points
     rain_alpha = kwrain.pop("alpha", alpha)
@@ -160,28 +405,12 @@ def RainCloud(
     # Category spacing
     category_spacing = kwargs.pop("category_spacing", 2.0)
 
-    # Get data from the inputs
-    if x is None and y is None:
-        raise ValueError("Either `x` or `y` must be specified")
-    elif x is None:
-        # Vertical plot with `y` as the categorical
-        categorical_var, value_var = y, x
-    elif y is None:
-        # Vertical plot with `x` as the categorical
-        categorical_var, value_var = x, y
-    else:
-        # Both x and y are specified, assume x is categorical
-        categorical_var, value_var = x, y
-
-    # Extract the data
-    categorical = data[categorical_var]
-    values = data[value_var]
+    # Get data from the inputs; a summary table replaces the raw rows
+    categorical_var, value_var = _split_variables(x, y)
+    source = data if summary is None else summary
 
     # Get the categorical levels and value data
-    if order is None:
-        categories = categorical.unique()
-    else:
-        categories = order
+    categories = _levels(source, categorical_var, order)
 
     # Get the hue levels and colors
     if hue is None:
@@ -189,7 +418,7 @@ def RainCloud(
         colors = ["C0"]
         legend = False
     else:
-        hue_levels = data[hue].unique() if hue_order is None else hue_order
+        hue_levels = _levels(source, hue, hue_order)
         n_colors = len(hue_levels)
 
         if palette is None:
@@ -209,6 +438,70 @@ def RainCloud(
 
     # Store hue categories for legend ordering
     hue_categories = hue_levels
+    laps.lap("setup")
+
+    # Assign every row to its (category, hue) cell
+    n_hue = len(hue_levels)
+    keys = _cell_keys(source, categorical_var, categories, hue, hue_levels, compact and summary is None)
+    laps.lap("partition", count=len(keys))
+
+    if summary is None:
+        # Compute the box statistics with the rest unless boxplot needs the raw data
+        whis = kwbox.get("whis", mpl.rcParams["boxplot.whiskers"])
+        if not np.isscalar(whis) or _BOXPLOT_ONLY_KWARGS & set(kwbox):
+            if weights is not None:
+                raise ValueError("These box options need Axes.boxplot, which cannot weight the observations")
+            whis = None
+            if box_method != "exact" or max_fliers is not None:
+                warnings.warn(
+                    "These box options need Axes.boxplot; ignoring `box_method` and `max_fliers`.", stacklevel=2
+                )
+
+        # Partition the values and compute every cell statistic in one pass
+        cell_stats = _cell_statistics(
+            _value_column(data, value_var, np.float32 if compact else float),
+            keys,
+            len(categories) * n_hue,
+            bw,
+            cut,
+            kde_engine,
+            whis,
+            cache,
+            box_method,
+            max_fliers,
+            n_jobs,
+            n_points,
+            value_range,
+            None if weights is None else _value_column(data, weights),
+            compact,
+        )
+    else:
+        cell_stats = _stats_from_summary(summary, keys, len(categories) * n_hue)
+
+    sorted_values, bounds = cell_stats.values, cell_stats.bounds
+    supports, densities, box_stats = cell_stats.supports, cell_stats.densities, cell_stats.box
+    laps.lap("statistics", count=len(categories) * n_hue)
+
+    # Pick the rain representation from the total number of observations
+    rain_cap = None
+    n_rain = len(sorted_values) if cell_stats.weights is None else cell_stats.counts.sum()
+    if rain_mode == "auto" and n_rain > rain_threshold:
+        rain_mode = "subsample"
+        kwrain.setdefault("rasterized", True)
+    elif rain_mode == "auto":
+        rain_mode = "points"
+    if rain_mode == "raster":
+        # Resolved here so that the shared rain scatters are rasterized too
+        kwrain["rasterized"] = True
+    if rain_mode == "subsample" and cell_stats.weights is None and len(sorted_values) > rain_threshold:
+        # Share the point budget between cells in proportion to their size
+        rain_cap = rain_threshold / len(sorted_values)
+
+    # The consolidated boxes only understand a subset of the box options
+    box_collection = render == "collections"
+    if box_collection and (box_stats is None or set(kwbox) - _BOX_COLLECTION_KWARGS):
+        warnings.warn("These box options need per-cell boxplots; drawing the boxes cell by cell.", stacklevel=2)
+        box_collection = False
 
     # Calculate positions for each category
     positions = np.arange(len(categories)) * category_spacing
@@ -221,49 +514,180 @@ def RainCloud(
     legend_handles = {}
     legend_labels = {}
 
+    # Point positions and means per hue level, reused by connect_means
+    cell_means = [([], []) for _ in range(n_hue)]
+
+    # Distances from every mean down and up to the ends of its error bar
+    cell_errors = None
+    if pointplot and ci == "sem":
+        cell_errors = np.vstack([cell_stats.sems, cell_stats.sems])
+    elif pointplot and ci == "bootstrap":
+        lo, hi = _bootstrap_intervals(
+            cell_stats.values,
+            cell_stats.bounds,
+            n_boot,
+            ci_level,
+            np.random.default_rng(seed),
+            cell_stats.weights,
+            n_jobs,
+        )
+        # An interval can miss the mean of a tiny cell; errorbar needs both ends on their side
+        cell_errors = np.maximum(np.vstack([cell_stats.means - lo, hi - cell_stats.means]), 0)
+        laps.lap("bootstrap", count=n_boot * len(cell_stats.values))
+    error_cells = [[] for _ in range(n_hue)]
+
+    # The global random state unless seeded; both offer uniform and choice
+    rng = np.random if random_state is None else np.random.default_rng(random_state)
+
+    # Weighted cells rain a proportional sample of the observations they stand for
+    if cell_stats.weights is not None:
+        budgets = cell_stats.counts * min(1.0, rain_threshold / max(n_rain, 1))
+        sorted_values, bounds = _weighted_rain(sorted_values, cell_stats.weights, bounds, budgets, rng)
+
+    # Centre of every cell, dodging the hue levels within each category
+    if dodge and n_hue > 1:
+        dodge_width = width_viol / n_hue
+        cell_positions = np.linspace(
+            positions - width_viol / 2 + dodge_width / 2,
+            positions + width_viol / 2 - dodge_width / 2,
+            n_hue,
+            axis=1,
+        )
+    else:
+        dodge_width = width_viol
+        cell_positions = np.repeat(positions[:, None], n_hue, axis=1)
+
+    # Lay out the rain of every cell from a single draw of jitter offsets
+    max_points = None if rain_cap is None else np.ceil(rain_cap * np.diff(bounds)).astype(np.intp)
+    rain_x, rain_y, rain_bounds = _rain_layout(
+        sorted_values,
+        bounds,
+        cell_positions.ravel() + rain_offset,
+        jitter,
+        jitter_range,
+        max_points,
+        rng,
+        supports,
+        densities,
+    )
+    laps.lap("rain_layout", count=len(rain_y))
+
+    # Pixels per data unit of the final view, for simplifying the violins
+    pixel_scale = None
+    view = value_range or _value_limits(supports, sorted_values, bounds, box_stats)
+    if gridsize == "auto" and view is not None:
+        pixel_scale = _pixel_scale(ax, (min(positions) - 1, max(positions) + 1), view)
+
+    handle = None
+    if return_handle:
+        handle = RainCloudHandle(
+            ax,
+            categorical_var,
+            value_var,
+            hue,
+            categories,
+            hue_levels,
+            stats_options=dict(
+                bw=bw,
+                cut=cut,
+                engine=kde_engine,
+                whis=whis,
+                box_method=box_method,
+                max_fliers=max_fliers,
+                gridsize=n_points,
+                value_range=value_range,
+            ),
+            draw_options=dict(
+                cloud=(cloud_offset, cloud_alpha, kwcloud, pixel_scale),
+                rain=(rain_offset, rain_alpha, kwrain, jitter, jitter_range, point_size, rain_mode, rain_cap, rng),
+                box=(box_offset, box_alpha, kwbox, width_box),
+                point=(point_offset, point_alpha, kwpoint) if pointplot else None,
+                means=(linecolor, linewidth) if connect_means and pointplot and hue is not None else None,
+            ),
+        )
+
+    # Layers gathered across cells when drawing into shared collections
+    violin_verts, violin_colors = [], []
+    rain_layers = [([], []) for _ in range(n_hue)]
+    box_cells, box_positions, box_colors = [], [], []
+
     # Plot each category
     for i, category in enumerate(categories):
-        # Get the position for this category
-        pos = positions[i]
-
-        # Filter data for this category
-        cat_mask = categorical == category
-        cat_vals = values[cat_mask]
-
-        if hue is not None:
-            hue_vals = data[hue][cat_mask]
-
-            # Plot each hue level
-            for j, level in enumerate(hue_levels):
-                hue_mask = hue_vals == level
-                hue_data = cat_vals[hue_mask]
-
-                if len(hue_data) == 0:
-                    continue
-
-                # Get color for this hue level
-                color = colors[j]
-
-                # Calculate offset for this hue level if dodging
-                if dodge and len(hue_levels) > 1:
-                    # Calculate the width of each dodge
-                    dodge_width = width_viol / len(hue_levels)
-                    # Calculate the positions for each hue level
-                    dodge_positions = np.linspace(
-                        pos - width_viol / 2 + dodge_width / 2,
-                        pos + width_viol / 2 - dodge_width / 2,
-                        len(hue_levels),
+        dodge_positions = cell_positions[i]
+
+        # Plot each hue level
+        for j, level in enumerate(hue_levels):
+            k = i * n_hue + j
+            cell_data = sorted_values[bounds[k] : bounds[k + 1]]
+            if handle is not None:
+                handle._add_cell(k, cell_data, colors[j], dodge_positions[j], dodge_width, supports[k])
+
+            if cell_stats.counts[k] == 0:
+                continue
+
+            # Get color and position for this hue level
+            color = colors[j]
+            dodge_pos = dodge_positions[j]
+            cell_x = rain_x[rain_bounds[k] : rain_bounds[k + 1]]
+            cell_y = rain_y[rain_bounds[k] : rain_bounds[k + 1]]
+
+            if render == "collections":
+                # Gather the violin, rain, box and point of this cell
+                if not np.isnan(densities[k][0]):
+                    violin_verts.append(
+                        _violin_vertices(
+                            supports[k],
+                            densities[k],
+                            dodge_pos + cloud_offset,
+                            dodge_width,
+                            pixel_scale,
+                            cell_stats.peaks[k],
+                        )
+                    )
+                    violin_colors.append(color)
+
+                if rain_mode == "hexbin":
+                    _draw_strip(
+                        ax,
+                        cell_y,
+                        dodge_pos + rain_offset,
+                        jitter,
+                        orient,
+                        color,
+                        point_size,
+                        rain_alpha,
+                        jitter_range=jitter_range,
+                        mode=rain_mode,
+                        positions=cell_x,
+                        **kwrain,
                     )
-                    # Get the position for this hue level
-                    dodge_pos = dodge_positions[j]
                 else:
-                    dodge_pos = pos
-                    dodge_width = width_viol
+                    rain_layers[j][0].append(cell_x)
+                    rain_layers[j][1].append(cell_y)
 
+                if box_collection:
+                    box_cells.append(k)
+                    box_positions.append(dodge_pos + box_offset)
+                    box_colors.append(color)
+                else:
+                    _draw_box(
+                        ax,
+                        cell_data,
+                        dodge_pos + box_offset,
+                        width_box,
+                        color,
+                        box_alpha,
+                        stats=None if box_stats is None else _cell_box_stats(box_stats, k),
+                        **kwbox,
+                    )
+
+                rain = None
+                laps.lap("gather", category, level, count=len(cell_data))
+            else:
                 # Draw half violin
-                _draw_half_violin(
+                violin = _draw_half_violin(
                     ax,
-                    hue_data,
+                    cell_data,
                     dodge_pos + cloud_offset,
                     dodge_width,
                     orient,
@@ -271,13 +695,17 @@ def RainCloud(
                     cloud_alpha,
                     bw,
                     cut,
+                    density=(supports[k], densities[k]),
+                    scale=pixel_scale,
+                    peak=cell_stats.peaks[k],
                     **kwcloud,
                 )
+                laps.lap("violin", category, level, count=len(cell_data))
 
                 # Draw strip plot (rain)
                 rain = _draw_strip(
                     ax,
-                    hue_data,
+                    cell_y,
                     dodge_pos + rain_offset,
                     jitter,
                     orient,
@@ -285,114 +713,118 @@ def RainCloud(
                     point_size,
                     rain_alpha,
                     jitter_range=jitter_range,
+                    mode=rain_mode,
+                    positions=cell_x,
                     **kwrain,
                 )
+                laps.lap("rain", category, level, count=len(cell_y))
 
-                # Set the label for the rain points (only once per hue level)
-                if level not in legend_handles:
+                # Draw box plot
+                box = _draw_box(
+                    ax,
+                    cell_data,
+                    dodge_pos + box_offset,
+                    width_box,
+                    color,
+                    box_alpha,
+                    stats=None if box_stats is None else _cell_box_stats(box_stats, k),
+                    **kwbox,
+                )
+                laps.lap("box", category, level, count=len(cell_data))
+                if handle is not None:
+                    handle._cells[k].update(violin=violin, rain=rain, box=box)
+
+            # Set the label for the rain points (only once per hue level)
+            if hue is not None and level not in legend_handles:
+                if rain_mode == "hexbin":
+                    # Hexagons are shaded by count, so show the plain color instead
+                    rain = mpatches.Patch(facecolor=color, alpha=rain_alpha)
+                # Shared rain scatters are labelled once they are drawn
+                if rain is not None:
                     rain.set_label(level)
                     legend_handles[level] = rain
                     legend_labels[level] = level
 
-                # Draw box plot
-                _draw_box(ax, hue_data, dodge_pos + box_offset, width_box, color, box_alpha, **kwbox)
-
-                # Draw point plot if requested
-                if pointplot:
-                    # Calculate mean and confidence interval
-                    mean = np.mean(hue_data)
+            # Draw point plot if requested
+            if pointplot:
+                # Reuse the precomputed mean, and keep it for connect_means
+                mean = cell_stats.means[k]
+                cell_means[j][0].append(dodge_pos + point_offset)
+                cell_means[j][1].append(mean)
+                error_cells[j].append(k)
+                if render != "collections":
                     # Draw the point
                     point = ax.scatter(
                         dodge_pos + point_offset, mean, color=color, alpha=point_alpha, zorder=30, **kwpoint
                     )
-        else:
-            # No hue, just plot the category
-            color = colors[0]
-
-            # Draw half violin
-            _draw_half_violin(
-                ax, cat_vals, pos + cloud_offset, width_viol, orient, color, cloud_alpha, bw, cut, **kwcloud
+                    if cell_errors is not None:
+                        errors = cell_errors[:, [k]]
+                        _draw_point(ax, [dodge_pos + point_offset], [mean], errors, color, point_alpha, **kwci)
+                    if handle is not None:
+                        handle._cells[k]["point"] = point
+                        handle._means[k] = mean
+                laps.lap("point", category, level, count=1)
+
+    # Draw the gathered layers, one collection each
+    if render == "collections":
+        if violin_verts:
+            ax.add_collection(
+                PolyCollection(violin_verts, facecolors=violin_colors, edgecolor="none", alpha=cloud_alpha, **kwcloud)
             )
 
-            # Draw strip plot (rain)
-            rain = _draw_strip(
-                ax,
-                cat_vals,
-                pos + rain_offset,
-                jitter,
-                orient,
-                color,
-                point_size,
-                rain_alpha,
-                jitter_range=jitter_range,
+        # One scatter per hue level keeps Agg's fast single-marker path
+        for j, (rain_x, rain_y) in enumerate(rain_layers):
+            if not rain_y:
+                continue
+            rain = ax.scatter(
+                np.concatenate(rain_x),
+                np.concatenate(rain_y),
+                color=colors[j],
+                s=point_size,
+                alpha=rain_alpha,
                 **kwrain,
             )
-
-            # Draw box plot
-            _draw_box(ax, cat_vals, pos + box_offset, width_box, color, box_alpha, **kwbox)
-
-            # Draw point plot if requested
-            if pointplot:
-                # Calculate mean and confidence interval
-                mean = np.mean(cat_vals)
-                # Draw the point
-                point = ax.scatter(
-                    pos + point_offset, mean, color=color, alpha=point_alpha, zorder=30, **kwpoint
-                )
+            if hue is not None:
+                rain.set_label(hue_levels[j])
+                legend_handles[hue_levels[j]] = rain
+                legend_labels[hue_levels[j]] = hue_levels[j]
+
+        if box_cells:
+            _draw_box_collection(ax, box_stats, box_cells, box_positions, width_box, box_colors, box_alpha, **kwbox)
+
+        # The points reuse the means gathered for connect_means
+        if pointplot:
+            for j, (pos_means, means) in enumerate(cell_means):
+                if means:
+                    ax.scatter(pos_means, means, color=colors[j], alpha=point_alpha, zorder=30, **kwpoint)
+                    if cell_errors is not None:
+                        errors = cell_errors[:, error_cells[j]]
+                        _draw_point(ax, pos_means, means, errors, colors[j], point_alpha, **kwci)
+        laps.lap("collections")
 
     # Connect means if requested
     if connect_means and pointplot and hue is not None:
-        # For each hue level
-        for j, level in enumerate(hue_levels):
-            # Get the means for this hue level
-            means = []
-            pos_means = []
-
-            # For each category
-            for i, category in enumerate(categories):
-                # Get the position for this category
-                pos = positions[i]
-
-                # Filter data for this category and hue level
-                cat_mask = categorical == category
-                cat_vals = values[cat_mask]
-
-                if hue is not None:
-                    hue_vals = data[hue][cat_mask]
-                    hue_mask = hue_vals == level
-                    hue_data = cat_vals[hue_mask]
-
-                    if len(hue_data) == 0:
-                        continue
-
-                    # Calculate dodge position if needed
-                    if dodge and len(hue_levels) > 1:
-                        # Calculate the width of each dodge
-                        dodge_width = width_viol / len(hue_levels)
-                        # Calculate the positions for each hue level
-                        dodge_positions = np.linspace(
-                            pos - width_viol / 2 + dodge_width / 2,
-                            pos + width_viol / 2 - dodge_width / 2,
-                            len(hue_levels),
-                        )
-                        # Get the position for this hue level
-                        dodge_pos = dodge_positions[j]
-                    else:
-                        dodge_pos = pos
-
-                    # Calculate mean
-                    mean = np.mean(hue_data)
-                    means.append(mean)
-                    pos_means.append(dodge_pos + point_offset)
-
-            # Connect the means
+        # For each hue level, connect the means computed above
+        for j, (pos_means, means) in enumerate(cell_means):
             if len(means) > 1:
-                ax.plot(pos_means, means, color=linecolor, linewidth=linewidth, zorder=19)
+                (line,) = ax.plot(pos_means, means, color=linecolor, linewidth=linewidth, zorder=19)
+                if handle is not None:
+                    handle._mean_lines[j] = line
+        laps.lap("means")
+
+    # Fit the value axis to every violin at once, with 20% padding on each,
+    # unless its limits were fixed beforehand
+    value_limits = _value_limits(supports, sorted_values, bounds, box_stats) if value_range is None else None
+    if value_limits is not None:
+        ax.set_ylim(*value_limits)
+        _own_limits[ax] = ax.get_ylim()
+    laps.lap("limits")
 
     # Set the x-axis
     ax.set_xticks(positions)
     ax.set_xticklabels(categories)
     ax.set_xlim(min(positions) - 1, max(positions) + 1)
+    laps.lap("axes")
 
     # Add legend if needed
     if hue is not None and legend:
@@ -410,210 +842,3068 @@ def RainCloud(
             # Create the legend
             if len(unique_handles) > 0:
                 ax.legend(handles=unique_handles, labels=unique_labels)
+    laps.lap("legend")
+    laps.finish(count=len(ax.get_children()))
 
-    return ax
+    return ax if handle is None else handle
 
 
-def _draw_half_violin(ax, data, position, width, orient, color, alpha=None, bw_adjust=1, cut=2):
+class RainCloudHandle:
     """
-    Draw a half violin plot (KDE plot)
+    Raincloud whose cells can be updated in place
+
+    Returned by ``RainCloud(..., return_handle=True)``. `set_data` and
+    `update` recompute the statistics of the affected cells only and move
+    their existing violin, rain, box and point artists (creating them for
+    cells that were empty), so only those artists become stale. The value
+    axis keeps its limits unless `rescale` is called, which suits
+    blitting-based redraws.
+
+    Attributes
+    ----------
+    ax : matplotlib axis
+        Axis with the raincloud plot.
     """
-    if len(data) < 2:
-        return None
 
-    # Calculate KDE (direct calculation)
-    kde = stats.gaussian_kde(data, bw_method=bw_adjust)
+    def __init__(self, ax, categorical_var, value_var, hue, categories, hue_levels, stats_options, draw_options):
+        self.ax = ax
+        self._categorical_var, self._value_var, self._hue = categorical_var, value_var, hue
+        self._categories, self._hue_levels = categories, hue_levels
+        self._stats_options, self._draw_options = stats_options, draw_options
+        self._cells, self._supports, self._means, self._mean_lines = {}, {}, {}, {}
+
+    def _add_cell(self, k, values, color, position, width, support):
+        self._cells[k] = dict(values=values, color=color, position=position, width=width)
+        self._cells[k].update(violin=None, rain=None, box=None, point=None)
+        self._supports[k] = support
+
+    def set_data(self, category, hue, values):
+        """
+        Replace the observations of one cell
+
+        Returns the artists that changed.
+        """
+        i = _factorize(pd.Series([category]), self._categories)[0]
+        j = 0 if self._hue is None else _factorize(pd.Series([hue]), self._hue_levels)[0]
+        if i < 0 or j < 0:
+            raise ValueError(f"No cell for category {category!r} and hue {hue!r}")
+
+        k = i * len(self._hue_levels) + j
+        self._cells[k]["values"] = np.asarray(values, dtype=float).ravel()
+        return self._redraw([k])
+
+    def update(self, new_rows):
+        """
+        Append rows, in any format accepted by `RainCloud`, to their cells
+
+        Rows outside the plotted categories and hue levels are ignored.
+        Returns the artists that changed.
+        """
+        keys = _cell_keys(new_rows, self._categorical_var, self._categories, self._hue, self._hue_levels)
+        values = _value_column(new_rows, self._value_var)
+        sorted_values, bounds = _partition(values, keys, len(self._cells))
+
+        changed = np.flatnonzero(np.diff(bounds))
+        for k in changed:
+            cell = self._cells[k]
+            cell["values"] = np.concatenate([cell["values"], sorted_values[bounds[k] : bounds[k + 1]]])
+        return self._redraw(changed)
+
+    def rescale(self):
+        """
+        Fit the value axis to the current violins
+        """
+        cells = list(self._supports)
+        values = [self._cells[k]["values"] for k in cells]
+        bounds = np.concatenate([[0], np.cumsum([len(v) for v in values])])
+        value_limits = _value_limits(np.array([self._supports[k] for k in cells]), np.concatenate(values), bounds)
+        if value_limits is not None:
+            self.ax.set_ylim(*value_limits)
+            _own_limits[self.ax] = self.ax.get_ylim()
+
+    def _redraw(self, cells):
+        changed = []
+        for k in cells:
+            changed += self._redraw_cell(k)
+
+        # Follow the moved means with their connecting lines
+        if self._draw_options["means"] is not None:
+            n_hue = len(self._hue_levels)
+            for j in {k % n_hue for k in cells}:
+                changed += self._redraw_mean_line(j)
+
+        return [artist for artist in changed if artist is not None]
+
+    def _redraw_cell(self, k):
+        ax, cell = self.ax, self._cells[k]
+        values, color, position = cell["values"], cell["color"], cell["position"]
+        stats = _cell_statistics(values, np.zeros(len(values), dtype=np.intp), 1, **self._stats_options)
+        changed = []
+
+        # Violin: new vertices for the same collection
+        cloud_offset, cloud_alpha, kwcloud, pixel_scale = self._draw_options["cloud"]
+        support, density = stats.supports[0], stats.densities[0]
+        self._supports[k] = support
+        if cell["violin"] is None:
+            cell["violin"] = _draw_half_violin(
+                ax,
+                values,
+                position + cloud_offset,
+                cell["width"],
+                "v",
+                color,
+                cloud_alpha,
+                density=(support, density),
+                scale=pixel_scale,
+                peak=stats.peaks[0],
+                **kwcloud,
+            )
+        elif np.isnan(density[0]):
+            cell["violin"].set_visible(False)
+        else:
+            vertices = _violin_vertices(
+                support, density, position + cloud_offset, cell["width"], pixel_scale, stats.peaks[0]
+            )
+            cell["violin"].set_verts([vertices])
+            cell["violin"].set_visible(True)
+        changed.append(cell["violin"])
+
+        # Rain: new offsets for the same scatter; hexbin images are redrawn
+        rain = self._draw_options["rain"]
+        rain_offset, rain_alpha, kwrain, jitter, jitter_range, point_size, rain_mode, rain_cap, rng = rain
+        max_points = None if rain_cap is None else int(np.ceil(rain_cap * len(values)))
+        rain_x, rain_y = _jitter_rain(
+            values, position + rain_offset, jitter, jitter_range, max_points, rng, (support, density)
+        )
+        if cell["rain"] is None or rain_mode == "hexbin":
+            if cell["rain"] is not None:
+                cell["rain"].remove()
+            cell["rain"] = _draw_strip(
+                ax,
+                rain_y,
+                position + rain_offset,
+                jitter,
+                "v",
+                color,
+                point_size,
+                rain_alpha,
+                jitter_range=jitter_range,
+                mode=rain_mode,
+                positions=rain_x,
+                **kwrain,
+            )
+        else:
+            cell["rain"].set_offsets(np.column_stack([rain_x, rain_y]))
+        changed.append(cell["rain"])
+
+        # Box: move the lines and the rectangle; other shapes are redrawn
+        box_offset, box_alpha, kwbox, width_box = self._draw_options["box"]
+        box_stats = None if stats.box is None else _cell_box_stats(stats.box, 0)
+        if cell["box"] is not None and box_stats is not None and not kwbox.get("notch", False):
+            _move_box(cell["box"], box_stats, position + box_offset)
+        else:
+            for artist in [] if cell["box"] is None else sum(cell["box"].values(), []):
+                artist.remove()
+            # Leave the category ticks alone
+            cell["box"] = _draw_box(
+                ax,
+                values,
+                position + box_offset,
+                width_box,
+                color,
+                box_alpha,
+                stats=box_stats,
+                manage_ticks=False,
+                **kwbox,
+            )
+        changed += [] if cell["box"] is None else sum(cell["box"].values(), [])
+
+        # Point: the new mean; an empty cell hides its point and leaves the mean line
+        if self._draw_options["point"] is not None and not len(values):
+            self._means.pop(k, None)
+            if cell["point"] is not None:
+                cell["point"].set_visible(False)
+                changed.append(cell["point"])
+        elif self._draw_options["point"] is not None:
+            point_offset, point_alpha, kwpoint = self._draw_options["point"]
+            self._means[k] = stats.means[0]
+            if cell["point"] is None:
+                cell["point"] = ax.scatter(
+                    position + point_offset, stats.means[0], color=color, alpha=point_alpha, zorder=30, **kwpoint
+                )
+            else:
+                cell["point"].set_offsets([[position + point_offset, stats.means[0]]])
+                cell["point"].set_visible(True)
+            changed.append(cell["point"])
+
+        return changed
+
+    def _redraw_mean_line(self, j):
+        n_hue = len(self._hue_levels)
+        point_offset = self._draw_options["point"][0]
+        cells = [k for k in sorted(self._means) if k % n_hue == j]
+        xs = [self._cells[k]["position"] + point_offset for k in cells]
+        ys = [self._means[k] for k in cells]
+        line = self._mean_lines.get(j)
+        if len(ys) < 2:
+            # Nothing left to connect
+            if line is None:
+                return []
+            line.set_visible(False)
+            return [line]
+
+        if line is None:
+            linecolor, linewidth = self._draw_options["means"]
+            (line,) = self.ax.plot(xs, ys, color=linecolor, linewidth=linewidth, zorder=19)
+            self._mean_lines[j] = line
+        else:
+            line.set_data(xs, ys)
+            line.set_visible(True)
+        return [line]
 
-    # Calculate KDE over a slightly extended range of data
-    data_min = data.min() - cut * data.std()
-    data_max = data.max() + cut * data.std()
-    x_points = np.linspace(data_min, data_max, 100)
-    y_points = kde(x_points)
 
-    # Get maximum density
-    max_density = np.max(y_points)
-    if max_density > 0:  # Avoid division by zero
-        y_points = y_points / max_density * width / 2
+def FacetRainCloud(
+    x=None,
+    y=None,
+    hue=None,
+    data=None,
+    row=None,
+    col=None,
+    order=None,
+    hue_order=None,
+    row_order=None,
+    col_order=None,
+    height=3,
+    aspect=1.5,
+    sharey=True,
+    bw="scott",
+    cut=2,
+    kde_engine="exact",
+    box_method="exact",
+    max_fliers=None,
+    n_jobs=None,
+    weights=None,
+    cache=False,
+    compact=False,
+    **kwargs,
+):
+    """
+    Draw a grid of raincloud panels, one per level of `row` and `col`
 
-    # Calculate coordinates to display only the left half
-    vertices = np.vstack(
-        [
-            np.column_stack([position - y_points, x_points]),
-            np.column_stack([np.ones(len(y_points)) * position, x_points[::-1]]),
-        ]
-    )
+    The data are partitioned once into (row, col, category, hue) cells and
+    all their statistics are computed in one batched pass; each panel then
+    draws its share from a summary (see `summarize_raincloud`), and the
+    value-axis limits are set once for the whole grid.
 
-    # Create polygon and draw
-    poly = PolyCollection([vertices], facecolor=color, edgecolor="none", alpha=alpha)
-    ax.add_collection(poly)
+    Parameters
+    ----------
+    x, y, hue, data, order, hue_order : see `RainCloud`
+        Every panel uses the same categories and hue levels.
+    row, col : str
+        Names of the variables that define the rows and columns of the grid.
+    row_order, col_order : list
+        Order of the facet levels; by default the order of appearance.
+    height : float
+        Height of each panel in inches.
+    aspect : float
+        Width of each panel relative to its height.
+    sharey : bool
+        Whether all panels share the value axis.
+    bw, cut, kde_engine, box_method, max_fliers, n_jobs, weights, cache, compact : see `RainCloud`
+    **kwargs : dict
+        Other keyword arguments passed to `RainCloud` for every panel. Box
+        options that need `Axes.boxplot` (such as ``box_sym``),
+        ``ci="bootstrap"``, `summary` and `return_handle` are not supported
+        and raise a ValueError. A `random_state` seed drives one generator
+        shared by all panels.
 
-    # Explicitly set axis range
-    # Ensure sufficient padding to prevent plot clipping
-    padding = (data_max - data_min) * 0.2  # Increased padding from 0.1 to 0.2
-    ax.set_ylim(data_min - padding, data_max + padding)
-
-    # Set x-axis range appropriately
-    # Ensure sufficient padding on both sides for all plots to be visible
-    current_xlim = ax.get_xlim()
-    new_xlim = (
-        min(current_xlim[0], position - width - padding),
-        max(current_xlim[1], position + width + padding * 2),
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        Figure holding the grid.
+    axes : ndarray of Axes
+        Panels, of shape (number of rows, number of columns).
+    """
+    # The panels draw from precomputed statistics, which rules out options needing the raw rows
+    whis = kwargs.get("box_whis", mpl.rcParams["boxplot.whiskers"])
+    if not np.isscalar(whis) or _BOXPLOT_ONLY_KWARGS & {key.replace("box_", "") for key in kwargs}:
+        raise ValueError("FacetRainCloud draws precomputed boxes; these box options need Axes.boxplot")
+    if kwargs.get("ci") == "bootstrap":
+        raise ValueError("FacetRainCloud does not support ci='bootstrap'; use ci='sem' or RainCloud per panel")
+    if kwargs.get("summary") is not None or kwargs.get("return_handle"):
+        raise ValueError("FacetRainCloud does not accept `summary` or `return_handle`")
+
+    categorical_var, value_var = _split_variables(x, y)
+    if kwargs.get("random_state") is not None:
+        kwargs["random_state"] = np.random.default_rng(kwargs["random_state"])
+
+    categories = _levels(data, categorical_var, order)
+    hue_levels = [None] if hue is None else _levels(data, hue, hue_order)
+    row_levels = [None] if row is None else _levels(data, row, row_order)
+    col_levels = [None] if col is None else _levels(data, col, col_order)
+    n_cells = len(categories) * len(hue_levels)
+
+    # One flat cell index over (row, col, category, hue)
+    keys = _cell_keys(data, categorical_var, categories, hue, hue_levels)
+    panels = np.zeros(len(keys), dtype=np.intp)
+    for facet, levels in ((row, row_levels), (col, col_levels)):
+        codes = np.zeros(len(keys), dtype=np.intp) if facet is None else _factorize(_column(data, facet), levels)
+        panels = np.where((panels >= 0) & (codes >= 0), panels * len(levels) + codes, -1)
+    keys = np.where((keys >= 0) & (panels >= 0), panels * n_cells + keys, -1)
+
+    fig, axes = plt.subplots(
+        len(row_levels),
+        len(col_levels),
+        figsize=(len(col_levels) * height * aspect, len(row_levels) * height),
+        squeeze=False,
     )
-    ax.set_xlim(new_xlim)
 
-    # Update axis range
-    ax.autoscale_view()
+    # All panels have the same size, so one of them sets an automatic grid
+    gridsize = kwargs.get("gridsize", 100)
+    if gridsize == "auto":
+        gridsize = _auto_gridsize(axes[0, 0])
+
+    stats = _cell_statistics(
+        _value_column(data, value_var, np.float32 if compact else float),
+        keys,
+        len(row_levels) * len(col_levels) * n_cells,
+        bw,
+        cut,
+        kde_engine,
+        whis,
+        cache=cache,
+        box_method=box_method,
+        max_fliers=max_fliers,
+        n_jobs=n_jobs,
+        gridsize=gridsize,
+        weights=None if weights is None else _value_column(data, weights),
+        compact=compact,
+    )
 
-    return poly
+    # Weighted cells keep a rain sample per cell instead of every observation
+    labels = [(row, row_levels), (col, col_levels), (categorical_var, categories), (hue, hue_levels)]
+    rain_sample = None if weights is None else kwargs.get("rain_threshold", 100_000)
+    table = _summary_table(stats, labels, rain_sample, kwargs.get("random_state") or np.random)
+    for (i, j), ax in np.ndenumerate(axes):
+        mask = np.ones(len(table), dtype=bool)
+        titles = []
+        for facet, level in ((row, row_levels[i]), (col, col_levels[j])):
+            if facet is not None:
+                mask &= (table[facet] == level).to_numpy()
+                titles.append(f"{facet} = {level}")
+
+        RainCloud(
+            x=x,
+            y=y,
+            hue=hue,
+            summary=table[mask],
+            order=categories,
+            hue_order=None if hue is None else hue_levels,
+            ax=ax,
+            **kwargs,
+        )
+        ax.set_title(" | ".join(titles))
+
+        # Keep a single legend, in the top-right panel
+        if (i, j) != (0, axes.shape[1] - 1) and ax.get_legend() is not None:
+            ax.get_legend().remove()
+
+    # Link the panels only now: every limit change on a shared axis visits
+    # all of its siblings, which makes drawing into shared panels quadratic
+    for (i, j), ax in np.ndenumerate(axes):
+        if (i, j) != (0, 0):
+            ax.sharex(axes[0, 0])
+            if sharey:
+                ax.sharey(axes[0, 0])
+        if i < axes.shape[0] - 1:
+            ax.tick_params(labelbottom=False)
+            ax.set_xlabel("")
+        if sharey and j > 0:
+            ax.tick_params(labelleft=False)
+            ax.set_ylabel("")
+
+    # Shared limits from every violin of the grid
+    value_limits = _value_limits(stats.supports, stats.values, stats.bounds, stats.box)
+    if sharey and value_limits is not None:
+        axes[0, 0].set_ylim(*value_limits)
+
+    return fig, axes
+
+
+def _split_variables(x, y):
+    """
+    Names of the categorical and value variables given `x` and `y`
+    """
+    if x is None and y is None:
+        raise ValueError("Either `x` or `y` must be specified")
+    elif x is None:
+        # Vertical plot with `y` as the categorical
+        return y, x
+    else:
+        # `x` is the categorical, whether or not `y` is given
+        return x, y
 
 
-def _draw_box(ax, data, position, width, color, alpha=None, **kwargs):
+def _cell_keys(source, categorical_var, categories, hue, hue_levels, compact=False):
     """
-    Draw a boxplot
+    Flat (category, hue) cell index of every row of `source`, or -1
+
+    With `compact`, the index uses the smallest signed integer type that
+    holds every cell and is built `_COMPACT_CHUNK` rows at a time, so no
+    full-length intp array is ever allocated.
     """
-    if len(data) < 1:
-        return None
+    n_hue = len(hue_levels)
+    cat_column = _column(source, categorical_var)
+    hue_column = None if hue is None else _column(source, hue)
+    if not compact:
+        return _combine_codes(cat_column, hue_column, categories, hue_levels, np.intp)
+
+    keys = np.empty(len(cat_column), dtype=np.min_scalar_type(-max(len(categories) * n_hue, 1)))
+    for start in range(0, len(keys), _COMPACT_CHUNK):
+        stop = start + _COMPACT_CHUNK
+        keys[start:stop] = _combine_codes(
+            cat_column[start:stop],
+            None if hue_column is None else hue_column[start:stop],
+            categories,
+            hue_levels,
+            keys.dtype,
+        )
+    return keys
+
+
+def _combine_codes(cat_column, hue_column, categories, hue_levels, dtype):
+    """
+    Flat cell index of the rows of a category and an optional hue column
+    """
+    cat_codes = _factorize(cat_column, categories).astype(dtype, copy=False)
+    if hue_column is None:
+        return cat_codes
+    hue_codes = _factorize(hue_column, hue_levels).astype(dtype, copy=False)
+    keys = cat_codes * np.asarray(len(hue_levels), dtype=dtype) + hue_codes
+    keys[(cat_codes < 0) | (hue_codes < 0)] = -1
+    return keys
 
-    # Remove parameters that can't be passed to boxplot
-    kwargs.pop("saturation", None)
 
-    # Set boxplot properties
-    boxprops = kwargs.pop("boxprops", {"facecolor": "none", "edgecolor": "black"})
-    boxprops["facecolor"] = color
-    boxprops["alpha"] = alpha
+def _column(data, name):
+    """
+    Column `name` of `data` as a 1-D array, without copying where possible
+
+    `data` may be a DataFrame, a dict of arrays, a structured NumPy array, a
+    pyarrow Table or a Polars DataFrame; the latter two are recognized
+    without importing their libraries. Numeric columns come back as NumPy
+    views of their buffers when they are contiguous and free of nulls.
+    Categorical and dictionary-encoded columns come back as a
+    `pandas.Categorical`, whose integer codes `_factorize` maps without
+    hashing every row.
+    """
+    library = type(data).__module__.partition(".")[0]
+    if library == "pyarrow":
+        column = data.column(name)
+        if hasattr(column.type, "index_type"):
+            # Dictionary-encoded: keep the indices as codes
+            return column.to_pandas().array
+        return column.to_numpy()
+    if library == "polars":
+        return data.get_column(name).to_numpy()
+
+    column = data[name]
+    if isinstance(column, (pd.Series, pd.Index)):
+        # Extension arrays (categorical, string, nullable) keep their own layout
+        return column.array if isinstance(column.dtype, pd.api.extensions.ExtensionDtype) else column.to_numpy()
+    if isinstance(column, pd.api.extensions.ExtensionArray):
+        return column
+    return np.asarray(column)
+
+
+def _value_column(data, name, dtype=float):
+    """
+    Column `name` of `data` as float64 (or `dtype`), missing values as NaN
+    """
+    column = _column(data, name)
+    if isinstance(column, pd.api.extensions.ExtensionArray):
+        return column.to_numpy(dtype=dtype, na_value=np.nan)
+    return np.asarray(column, dtype=dtype)
 
-    # Set flier (outlier) marker properties - reduce size by 1/2
-    flierprops = kwargs.pop("flierprops", {})
-    flierprops.setdefault("marker", "o")
-    flierprops.setdefault("markerfacecolor", color)
-    flierprops.setdefault("markeredgecolor", "black")
-    flierprops.setdefault("markersize", 3)  # Reduced from default ~6 to 3 (1/2 size)
-    flierprops.setdefault("alpha", alpha)
 
-    # Set whisker properties - reduce cap size by 2/3 of current size
-    whiskerprops = {}
-    whiskerprops["linewidth"] = 0.7  # Further reduced from 1.0 to 0.7 (2/3 of current size)
+def _levels(data, name, order=None):
+    """
+    `order`, or the distinct values of column `name` in order of appearance
+    """
+    return pd.unique(_column(data, name)) if order is None else order
 
-    # Set cap properties - reduce width by 2/3 of current size
-    capprops = {}
-    capprops["linewidth"] = 0.7  # Further reduced from 1.0 to 0.7 (2/3 of current size)
 
-    # Override any user-provided properties
-    user_whiskerprops = kwargs.pop("whiskerprops", {})
-    user_capprops = kwargs.pop("capprops", {})
-    whiskerprops.update(user_whiskerprops)
-    capprops.update(user_capprops)
+def _factorize(column, levels):
+    """
+    Encode a column as integer positions into `levels` (-1 where absent)
+    """
+    index = pd.Index(levels)
+    if isinstance(column, pd.Categorical):
+        # Look up each category once, then gather by code (-1 stays -1)
+        lookup = np.append(index.get_indexer(column.categories), -1)
+        return lookup[column.codes]
+    return index.get_indexer(column)
 
-    # Create the boxplot with our specific properties
-    box = ax.boxplot(
-        [data],
-        positions=[position],
-        widths=width,
-        vert=True,
-        patch_artist=True,
-        boxprops=boxprops,
-        flierprops=flierprops,
-        whiskerprops=whiskerprops,
-        capprops=capprops,
-        **kwargs,
-    )
 
-    return box
+def _partition(values, keys, n_cells, weights=None, chunk=None):
+    """
+    Split values into contiguous per-cell slices with a single stable sort
 
+    Parameters
+    ----------
+    values : ndarray
+        Observations to split.
+    keys : ndarray of int
+        Flat cell index of each observation, or -1 to drop it.
+    n_cells : int
+        Total number of cells.
+    weights : ndarray
+        Optional weight of each observation, reordered alongside.
+    chunk : int
+        Sort this many rows at a time and scatter them into their cells,
+        instead of sorting all of them at once. The result is the same, but
+        no index array over all rows is allocated.
 
-def _draw_strip(ax, data, position, jitter, orient, color, size, alpha=None, jitter_range=0.05, **kwargs):
-    """
-    Draw scatter points (rain part)
+    Returns
+    -------
+    sorted_values : ndarray
+        Values grouped by cell, preserving the original row order within a cell.
+    bounds : ndarray
+        Cell `k` is ``sorted_values[bounds[k]:bounds[k + 1]]``.
+    sorted_weights : ndarray
+        The weights in the order of `sorted_values`, only returned with `weights`.
     """
-    if len(data) < 1:
-        return None
+    if chunk is not None and len(keys) > chunk:
+        return _partition_chunked(values, keys, n_cells, weights, chunk)
 
-    # Jitter points if requested
-    if jitter:
-        # Add jitter with a uniform random distribution
-        jitter_offsets = np.random.uniform(-jitter_range, jitter_range, size=len(data))
-        positions = np.full(len(data), position) + jitter_offsets
-    else:
-        positions = np.full(len(data), position)
+    valid = keys >= 0
+    if not valid.all():
+        values, keys = values[valid], keys[valid]
+        weights = None if weights is None else weights[valid]
 
-    # Draw the points
-    points = ax.scatter(positions, data, color=color, s=size, alpha=alpha, **kwargs)
+    order = np.argsort(keys, kind="stable")
+    counts = np.bincount(keys, minlength=n_cells)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
 
-    return points
+    if weights is not None:
+        return values[order], bounds, weights[order]
+    return values[order], bounds
 
 
-def _draw_point(ax, data, position, color, **kwargs):
+def _partition_chunked(values, keys, n_cells, weights, chunk):
     """
-    Draw a point plot (mean and confidence interval)
+    `_partition` by counting sort, `chunk` rows at a time
     """
-    if len(data) < 2:
-        return None
+    counts = np.zeros(n_cells, dtype=np.intp)
+    for start in range(0, len(keys), chunk):
+        block = keys[start : start + chunk]
+        counts += np.bincount(block[block >= 0], minlength=n_cells)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    # Each block's rows go after those of the earlier blocks in the same cell
+    sorted_values = np.empty(bounds[-1], dtype=values.dtype)
+    sorted_weights = None if weights is None else np.empty(bounds[-1], dtype=weights.dtype)
+    filled = bounds[:-1].copy()
+    for start in range(0, len(keys), chunk):
+        block = keys[start : start + chunk]
+        valid = np.flatnonzero(block >= 0)
+        block = block[valid]
+        order = np.argsort(block, kind="stable")
+        block_counts = np.bincount(block, minlength=n_cells)
+        block_starts = np.cumsum(block_counts) - block_counts
+        target = np.repeat(filled - block_starts, block_counts) + np.arange(len(order))
+        rows = start + valid[order]
+        sorted_values[target] = values[rows]
+        if weights is not None:
+            sorted_weights[target] = weights[rows]
+        filled += block_counts
+
+    if weights is not None:
+        return sorted_values, bounds, sorted_weights
+    return sorted_values, bounds
+
+
+# Internal bins per bandwidth and the cap on their number for the binned engines
+_KDE_BINS_PER_BW = 8
+_KDE_MAX_BINS = 2**16
+
+# Kernel truncation radius, in bandwidths, for the direct binned convolution
+_KDE_TRUNCATE = 5.0
+
+# Upper bound on kernel evaluations held in memory at once by the exact engine
+_KDE_CHUNK = 2**22
+
+# Rows handled at a time by the compact data path
+_COMPACT_CHUNK = 2**18
+
+
+def _rule_factors(n, bw):
+    """
+    Bandwidth factors for sample sizes `n`, or None if `bw` needs the data
+    """
+    n = np.asarray(n, dtype=float)
+    if isinstance(bw, str) and bw == "scott":
+        return n ** (-1.0 / 5)
+    if isinstance(bw, str) and bw == "silverman":
+        return (n * 3.0 / 4) ** (-1.0 / 5)
+    if np.isscalar(bw) and not isinstance(bw, str):
+        return np.full(n.shape, float(bw))
+    return None
 
-    # Remove parameters that can't be passed to errorbar
-    kwargs.pop("errwidth", None)
-    kwargs.pop("capsize", None)
 
-    # Calculate mean and standard error
-    mean = np.mean(data)
-    sem = np.std(data, ddof=1) / np.sqrt(len(data))
+def _kde_factors(values, bounds, groups, bw, weights=None):
+    """
+    Bandwidth factors (multiples of the sample std) as chosen by gaussian_kde
 
-    # Draw point plot
-    errorbar = ax.errorbar(position, mean, yerr=sem, fmt="o", color=color, **kwargs)
+    With frequency `weights`, the rules use the total weight as sample size.
+    """
+    if weights is None:
+        sizes = np.diff(bounds)[groups]
+    else:
+        sizes = np.array([weights[bounds[k] : bounds[k + 1]].sum() for k in groups])
+    factors = _rule_factors(sizes, bw)
+    if factors is not None:
+        return factors
 
-    return errorbar
+    # Callables (and invalid values, which scipy rejects) go through scipy
+    return np.array(
+        [
+            stats.gaussian_kde(
+                values[bounds[k] : bounds[k + 1]],
+                bw_method=bw,
+                weights=None if weights is None else weights[bounds[k] : bounds[k + 1]],
+            ).factor
+            for k in groups
+        ]
+    )
 
 
-# Function to explicitly set labels for plot elements
-def _add_legend_data(ax, handle, label):
+def _kde_binned(data, support, bandwidth, use_fft=False, weights=None):
     """
-    Function to explicitly set labels for plot elements
+    Gaussian KDE by linear binning followed by a discrete convolution
 
-    Parameters
-    ----------
-    ax : matplotlib.axes.Axes
-        Axis to add legend to
-    handle : object
-        Handle to add to the legend
-    label : str
-        Label to display in the legend
-    """
-    # Simply set the label for the handle
-    handle.set_label(label)
+    The data are linearly binned onto a fine internal grid spanning `support`
+    (about `_KDE_BINS_PER_BW` bins per bandwidth), convolved with the sampled
+    kernel, and interpolated back onto `support`. With bin width ``delta`` and
+    bandwidth ``h`` the absolute difference from the exact estimate is at most::
 
-    # The legend will be created later with ax.legend()
+        delta**2 * phi(0) / (4 * h**3)                  (fft)
+        delta**2 * phi(0) / (4 * h**3) + phi(5) / h     (binned)
 
+    where ``phi`` is the standard normal density: one ``delta**2 / 8`` term
+    for the binning and one for the interpolation back onto `support`, plus
+    the mass dropped by truncating the kernel at five bandwidths. At eight
+    bins per bandwidth this is below 0.4% of the largest density a Gaussian
+    KDE with bandwidth ``h`` can reach.
 
-# Function to apply Nature style guidelines
-def apply_nature_style(fig=None, ax=None, font_size=8):
+    `weights` optionally gives the number of observations at each point.
     """
-    Apply Nature journal style guidelines to the plot
+    n = len(data) if weights is None else weights.sum()
+    # Bin all of the data even when the support is clipped to a view
+    lo, hi = min(support[0], data.min()), max(support[-1], data.max())
+    n_bins = int(np.clip(np.ceil((hi - lo) / bandwidth * _KDE_BINS_PER_BW) + 1, len(support), _KDE_MAX_BINS))
+    grid, delta = np.linspace(lo, hi, n_bins, retstep=True)
+
+    # Linear binning: split each observation between its two neighbouring nodes
+    pos = np.clip((data - lo) / delta, 0, n_bins - 1)
+    left = np.minimum(pos.astype(np.intp), n_bins - 2)
+    frac = pos - left
+    if weights is None:
+        counts = np.bincount(left, weights=1 - frac, minlength=n_bins)
+        counts += np.bincount(left + 1, weights=frac, minlength=n_bins)
+    else:
+        counts = np.bincount(left, weights=(1 - frac) * weights, minlength=n_bins)
+        counts += np.bincount(left + 1, weights=frac * weights, minlength=n_bins)
 
-    Parameters
-    ----------
-    fig : matplotlib.figure.Figure, optional
-        Figure to apply style to
-    ax : matplotlib.axes.Axes, optional
-        Axis to apply style to
-    font_size : int, optional
-        Font size to use (default: 8)
-    """
-    if fig is not None:
-        # Set figure size to Nature guidelines
-        fig.set_size_inches(3.5, 2.625)  # 89 mm x 66.7 mm
+    # Sample the kernel; the FFT path uses the whole grid so nothing is truncated
+    if use_fft:
+        radius = n_bins - 1
+    else:
+        radius = min(int(np.ceil(_KDE_TRUNCATE * bandwidth / delta)), n_bins - 1)
+    offsets = np.arange(-radius, radius + 1) * (delta / bandwidth)
+    kernel = np.exp(-0.5 * offsets**2) / (np.sqrt(2 * np.pi) * bandwidth * n)
 
-    if ax is not None:
-        # Set font sizes
-        ax.title.set_fontsize(font_size)
-        ax.xaxis.label.set_fontsize(font_size)
-        ax.yaxis.label.set_fontsize(font_size)
+    if use_fft:
+        size = fft.next_fast_len(n_bins + len(kernel) - 1, real=True)
+        smoothed = fft.irfft(fft.rfft(counts, size) * fft.rfft(kernel, size), size)
+    else:
+        smoothed = np.convolve(counts, kernel)
+    smoothed = np.maximum(smoothed[radius : radius + n_bins], 0)
 
-        # Set tick parameters
-        ax.tick_params(axis="both", which="major", labelsize=font_size - 1)
+    return np.interp(support, grid, smoothed)
 
-        # Set spines
+
+def _kde_exact(values, bounds, groups, supports, bandwidths, weights=None):
+    """
+    Sum Gaussian kernels exactly on every group's grid, in bounded-memory chunks
+
+    Each group is cut into blocks of at most ``_KDE_CHUNK // gridsize`` points
+    counted from its own start, and consecutive blocks are evaluated together
+    in one broadcast operation. A group's result therefore does not depend on
+    which other groups share the call. `weights` scale each point's kernel.
+    """
+    gridsize = supports.shape[1]
+    block = max(_KDE_CHUNK // gridsize, 1)
+    sums = np.zeros(supports.shape)
+
+    # (row, start, stop) pieces in data order
+    pieces = [
+        (row, start, min(start + block, bounds[k + 1]))
+        for row, k in enumerate(groups)
+        for start in range(bounds[k], bounds[k + 1], block)
+    ]
+
+    i = 0
+    while i < len(pieces):
+        # Take as many consecutive pieces as fit in one chunk
+        j, size = i, 0
+        while j < len(pieces) and size + pieces[j][2] - pieces[j][1] <= block:
+            size += pieces[j][2] - pieces[j][1]
+            j += 1
+        batch = pieces[i:j]
+        i = j
+
+        rows = np.array([k for k, _, _ in batch])
+        lengths = np.array([stop - start for _, start, stop in batch])
+        x = np.concatenate([values[start:stop] for _, start, stop in batch])
+        owner = np.repeat(rows, lengths)
+
+        # Standardized distances, turned into kernel values in place (in float32 for float32 values)
+        z = supports.astype(values.dtype, copy=False)[owner]
+        z -= x[:, None]
+        z /= bandwidths[owner, None]
+        z *= z
+        z *= -0.5
+        np.exp(z, out=z)
+        if weights is not None:
+            z *= np.concatenate([weights[start:stop] for _, start, stop in batch])[:, None]
+        kernel_sums = np.add.reduceat(z, np.cumsum(lengths) - lengths, axis=0)
+        np.add.at(sums, rows, kernel_sums)
+
+    if weights is None:
+        counts = np.diff(bounds)[groups]
+    else:
+        counts = np.array([weights[bounds[k] : bounds[k + 1]].sum() for k in groups])
+    return sums / (counts * bandwidths * np.sqrt(2 * np.pi))[:, None]
+
+
+def _group_moments(values, bounds, weights=None):
+    """
+    Size, min, max, mean and sample std (ddof=1) of each contiguous group
+
+    With frequency `weights` the size is the total weight, and the mean and
+    std are those of the observations the weights stand for.
+    """
+    counts = np.diff(bounds)
+    vmin, vmax, mean, std = (np.full(len(counts), np.nan) for _ in range(4))
+    sizes = counts
+    if weights is not None:
+        sizes = np.bincount(np.repeat(np.arange(len(counts)), counts), weights, len(counts))
+
+    nonempty = counts > 0
+    if nonempty.any():
+        starts = bounds[:-1][nonempty]
+        vmin[nonempty] = np.minimum.reduceat(values, starts)
+        vmax[nonempty] = np.maximum.reduceat(values, starts)
+        weighted = values if weights is None else values * weights
+        mean[nonempty] = np.add.reduceat(weighted, starts) / sizes[nonempty]
+        # Form and square the deviations in place, in the precision of the values, to keep a single temporary
+        deviations = np.repeat(mean[nonempty].astype(values.dtype), counts[nonempty])
+        np.subtract(values, deviations, out=deviations)
+        np.square(deviations, out=deviations)
+        if weights is not None:
+            deviations *= weights
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std[nonempty] = np.sqrt(np.add.reduceat(deviations, starts) / (sizes[nonempty] - 1))
+
+    return sizes, vmin, vmax, mean, std
+
+
+def _compute_densities(
+    values, bounds, bw="scott", cut=2, gridsize=100, engine="exact", moments=None, value_range=None, weights=None
+):
+    """
+    Batched KDE over contiguous groups ``values[bounds[k]:bounds[k + 1]]``
+
+    `moments` optionally reuses the output of `_group_moments`. With
+    `value_range`, the supports are clipped to it and groups whose support
+    lies outside of it get no density. `weights` are frequency weights.
+    """
+    if engine not in KDE_ENGINES:
+        raise ValueError(f"`kde_engine` must be one of {KDE_ENGINES}, got {engine!r}")
+
+    counts, vmin, vmax, _, std = _group_moments(values, bounds, weights) if moments is None else moments
+    supports = np.full((len(counts), gridsize), np.nan)
+    densities = np.full((len(counts), gridsize), np.nan)
+
+    # Extend each support `cut` standard deviations past the extreme values
+    lo, hi = vmin - cut * std, vmax + cut * std
+    if value_range is not None:
+        lo, hi = np.maximum(lo, value_range[0]), np.minimum(hi, value_range[1])
+
+    # Groups without at least two distinct values have no density
+    valid = np.flatnonzero((counts >= 2) & (std > 0) & (lo < hi))
+    if len(valid) == 0:
+        return supports, densities
+
+    supports[valid] = np.linspace(lo[valid], hi[valid], gridsize, axis=1)
+
+    bandwidths = _kde_factors(values, bounds, valid, bw, weights) * std[valid]
+
+    if engine == "exact":
+        densities[valid] = _kde_exact(values, bounds, valid, supports[valid], bandwidths, weights)
+    else:
+        for k, bandwidth in zip(valid, bandwidths):
+            densities[k] = _kde_binned(
+                values[bounds[k] : bounds[k + 1]],
+                supports[k],
+                bandwidth,
+                use_fft=engine == "fft",
+                weights=None if weights is None else weights[bounds[k] : bounds[k + 1]],
+            )
+
+    return supports, densities
+
+
+def compute_densities(groups, bw="scott", cut=2, gridsize=100, engine="exact"):
+    """
+    Evaluate Gaussian KDEs for many groups in one vectorized pass
+
+    Parameters
+    ----------
+    groups : sequence of array-like
+        One 1d array of observations per group.
+    bw : float or str or callable
+        Bandwidth factor or rule ("scott", "silverman"), as in gaussian_kde.
+    cut : float
+        How far, in standard deviations, to extend each grid past the extreme
+        datapoints.
+    gridsize : int
+        Number of evaluation points per group.
+    engine : "exact" or "binned" or "fft"
+        Density engine, see `RainCloud`.
+
+    Returns
+    -------
+    supports, densities : ndarray of shape (n_groups, gridsize)
+        Evaluation grid and density of each group. Rows are NaN for groups
+        with fewer than two observations or no spread.
+    """
+    groups = [np.asarray(group, dtype=float).ravel() for group in groups]
+    bounds = np.concatenate([[0], np.cumsum([len(group) for group in groups], dtype=np.intp)])
+    values = np.concatenate(groups) if groups else np.empty(0)
+
+    return _compute_densities(values, bounds, bw, cut, gridsize, engine)
+
+
+def _kde(data, bw="scott", cut=2, gridsize=100, engine="exact"):
+    """
+    Evaluate a Gaussian KDE of a single group
+
+    Returns ``(support, density)``, or None when the data have no spread.
+    """
+    supports, densities = compute_densities([data], bw, cut, gridsize, engine)
+    if np.isnan(densities[0, 0]):
+        return None
+
+    return supports[0], densities[0]
+
+
+def _value_limits(supports, values=None, bounds=None, box=None):
+    """
+    Value-axis limits covering all violin supports with 20% padding
+
+    Cells drawn without a violin (fewer than two or only equal values) are
+    covered as well: the limits grow to the extremes of their rain
+    (`values` split by `bounds`) and of their whiskers and fliers in `box`,
+    with 5% padding. Returns None when no group has a density.
+    """
+    drawn = ~np.isnan(supports[:, 0])
+    if not drawn.any():
+        return None
+
+    data_min, data_max = supports[drawn, 0], supports[drawn, -1]
+    padding = (data_max - data_min) * 0.2
+    low, high = (data_min - padding).min(), (data_max + padding).max()
+
+    # Extremes of the cells without a violin
+    extremes = []
+    for k in np.flatnonzero(~drawn):
+        if values is not None and bounds[k + 1] > bounds[k]:
+            extremes.append(values[bounds[k] : bounds[k + 1]])
+        if box is not None:
+            extremes.append(_cell_box_stats(box, k)["fliers"])
+            extremes.append([box["whislo"][k], box["whishi"][k]])
+    extremes = np.concatenate([np.asarray(e, dtype=float) for e in extremes]) if extremes else np.empty(0)
+    extremes = extremes[~np.isnan(extremes)]
+    if len(extremes):
+        padding = (max(high, extremes.max()) - min(low, extremes.min())) * 0.05
+        low, high = min(low, extremes.min() - padding), max(high, extremes.max() + padding)
+    return low, high
+
+
+def _violin_vertices(x_points, y_points, position, width, scale=None, peak=None):
+    """
+    Polygon of a left half violin scaled to `width` at its widest point
+
+    `peak` is the density drawn at `width`, by default the largest of
+    `y_points`; a violin clipped to the view passes the peak of its whole
+    support so that it keeps the width it would have unclipped.
+
+    With `scale`, the pixels per data unit along x and y, vertices that lie
+    within matplotlib's sub-pixel simplification threshold of the outline
+    are dropped.
+    """
+    # Get maximum density
+    max_density = np.max(y_points) if peak is None else peak
+    if max_density > 0:  # Avoid division by zero
+        y_points = y_points / max_density * width / 2
+
+    # Calculate coordinates to display only the left half
+    vertices = np.vstack(
+        [
+            np.column_stack([position - y_points, x_points]),
+            np.column_stack([np.ones(len(y_points)) * position, x_points[::-1]]),
+        ]
+    )
+    if scale is not None:
+        path = mpath.Path(vertices).cleaned(transform=mtransforms.Affine2D().scale(*scale), simplify=True)
+        vertices = path.vertices[path.codes != mpath.Path.STOP] / scale
+
+    return vertices
+
+
+# Screen pixels between density evaluation points with gridsize="auto"
+_PIXELS_PER_KDE_POINT = 2
+_AUTO_GRIDSIZE_RANGE = (16, 4096)
+
+
+def _axes_pixels(ax):
+    """
+    Width and height of the axis in pixels at the figure or, if larger, savefig dpi
+    """
+    fig = ax.figure
+    savefig_dpi = mpl.rcParams["savefig.dpi"]
+    factor = max(1, (fig.dpi if savefig_dpi == "figure" else savefig_dpi) / fig.dpi)
+    return ax.bbox.width * factor, ax.bbox.height * factor
+
+
+def _auto_gridsize(ax, clipped=False):
+    """
+    Density grid size placing points about `_PIXELS_PER_KDE_POINT` pixels apart
+
+    Autoscaled limits pad every violin by 20% of its extent on each side, so
+    the tallest one spans 1/1.4 of the axis height; a violin clipped to
+    fixed limits spans at most all of it.
+    """
+    height = _axes_pixels(ax)[1] if clipped else _axes_pixels(ax)[1] / 1.4
+    return int(np.clip(np.ceil(height / _PIXELS_PER_KDE_POINT), *_AUTO_GRIDSIZE_RANGE))
+
+
+def _pixel_scale(ax, xlim, ylim):
+    """
+    Pixels per data unit along x and y for the given view of the axis
+    """
+    width, height = _axes_pixels(ax)
+    return width / (xlim[1] - xlim[0]), height / (ylim[1] - ylim[0])
+
+
+class _CellStats:
+    """
+    Statistics of every (category, hue) cell, stored as stacked arrays
+
+    Cell `k` has ``counts[k]`` observations, of which the rain shows
+    ``values[bounds[k]:bounds[k + 1]]`` (all of them unless the statistics
+    come from a summary); row `k` of the other arrays describes it (see
+    `compute_densities` and `_box_stats`). `box` is None when the boxes must
+    be computed by `Axes.boxplot`. With frequency `weights`, aligned with
+    `values`, ``counts[k]`` is the total weight of the cell. ``peaks[k]`` is
+    the largest density of cell `k` over its whole support, which exceeds
+    the largest drawn density when the support is clipped to the view.
+    """
+
+    __slots__ = ("counts", "values", "bounds", "supports", "densities", "box", "means", "sems", "weights", "peaks")
+
+    def __init__(self, counts, values, bounds, supports, densities, box, means, sems, weights=None, peaks=None):
+        self.counts = counts
+        self.values = values
+        self.bounds = bounds
+        self.supports = supports
+        self.densities = densities
+        self.box = box
+        self.means = means
+        self.sems = sems
+        self.weights = weights
+        self.peaks = densities.max(axis=1) if peaks is None else peaks
+
+
+class _StatsCache:
+    """
+    Least-recently-used store of `_CellStats`, keyed on a data fingerprint
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        stats = self._entries.get(key)
+        if stats is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return stats
+
+    def put(self, key, stats):
+        self._entries[key] = stats
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_stats_cache = _StatsCache()
+
+# Value limits RainCloud itself last set on each axis, told apart from limits
+# fixed by the caller when choosing an automatic density grid
+_own_limits = weakref.WeakKeyDictionary()
+
+
+def set_stats_cache_size(maxsize):
+    """
+    Bound the number of plots whose statistics are kept by `RainCloud(cache=True)`
+
+    Each entry holds a sorted copy of the plotted values, so the bound also
+    caps the memory retained by the cache. Shrinking it evicts the least
+    recently used entries.
+    """
+    _stats_cache.maxsize = maxsize
+    while len(_stats_cache._entries) > maxsize:
+        _stats_cache._entries.popitem(last=False)
+
+
+def clear_stats_cache():
+    """
+    Drop every cached cell statistic and reset the hit and miss counters
+    """
+    _stats_cache.clear()
+
+
+def stats_cache_info():
+    """
+    Hits, misses, bound and current size of the cell statistics cache
+    """
+    return {
+        "hits": _stats_cache.hits,
+        "misses": _stats_cache.misses,
+        "maxsize": _stats_cache.maxsize,
+        "currsize": len(_stats_cache._entries),
+    }
+
+
+# Profiles receiving the timings of RainCloud calls, see `profile_raincloud`
+_active_profiles = []
+
+
+class RainCloudProfile:
+    """
+    Phase and cell timings of the RainCloud calls made under `profile_raincloud`
+
+    Every record is a dict with the ``call`` number, the ``phase``, the
+    ``category`` and ``hue`` of per-cell phases, the elapsed ``seconds`` and
+    an element ``count`` (rows, cells, observations or artists). The phases
+    of a call are "setup", "partition" (assigning rows to cells),
+    "statistics", "rain_layout"; per cell "violin", "rain", "box" and
+    "point", or "gather" (and "point") with ``render="collections"``; then
+    "collections", "means", "limits", "axes" and "legend". A final "total"
+    record spans the whole call and counts the artists on the axis.
+    """
+
+    COLUMNS = ("call", "phase", "category", "hue", "seconds", "count")
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.records = []
+        self.n_calls = 0
+
+    def _record(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def to_frame(self):
+        """
+        The records as a DataFrame with one row each
+        """
+        return pd.DataFrame(self.records, columns=list(self.COLUMNS))
+
+    def summary(self):
+        """
+        Number of records and total seconds of each phase, slowest first
+        """
+        frame = self.to_frame()
+        return frame.groupby("phase", sort=False)["seconds"].agg(["count", "sum"]).sort_values("sum", ascending=False)
+
+
+@contextlib.contextmanager
+def profile_raincloud(callback=None):
+    """
+    Record the phase and cell timings of the RainCloud calls in a block
+
+    Parameters
+    ----------
+    callback : callable
+        Called with every record as it is made, e.g. to forward it to a
+        metrics system.
+
+    Yields
+    ------
+    profile : RainCloudProfile
+        Collects the records.
+
+    Examples
+    --------
+    >>> with profile_raincloud() as profile:
+    ...     RainCloud(x="group", y="value", data=df)
+    >>> profile.summary()
+    """
+    profile = RainCloudProfile(callback)
+    _active_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        _active_profiles.remove(profile)
+
+
+class _Laps:
+    """
+    Times consecutive phases of one RainCloud call for the active profiles
+
+    Each `lap` records the time since the previous one; without active
+    profiles it does nothing.
+    """
+
+    __slots__ = ("profiles", "calls", "start", "last")
+
+    def __init__(self):
+        self.profiles = list(_active_profiles)
+        for profile in self.profiles:
+            profile.n_calls += 1
+        self.calls = [profile.n_calls for profile in self.profiles]
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, phase, category=None, hue=None, count=None):
+        if self.profiles:
+            now = time.perf_counter()
+            self._emit(phase, category, hue, now - self.last, count)
+            self.last = now
+
+    def finish(self, count=None):
+        if self.profiles:
+            self._emit("total", None, None, time.perf_counter() - self.start, count)
+
+    def _emit(self, phase, category, hue, seconds, count):
+        for profile, call in zip(self.profiles, self.calls):
+            profile._record(
+                {"call": call, "phase": phase, "category": category, "hue": hue, "seconds": seconds, "count": count}
+            )
+
+
+def _fingerprint(values, keys, *params, weights=None):
+    """
+    Cheap content hash of the values, their cell keys, weights and the parameters
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (values, keys) if weights is None else (values, keys, weights):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def _cell_statistics(
+    values,
+    keys,
+    n_cells,
+    bw="scott",
+    cut=2,
+    engine="exact",
+    whis=1.5,
+    cache=False,
+    box_method="exact",
+    max_fliers=None,
+    n_jobs=None,
+    gridsize=100,
+    value_range=None,
+    weights=None,
+    compact=False,
+):
+    """
+    Partition the values into cells and compute all of their statistics
+
+    `whis` is None when the box statistics are left to `Axes.boxplot`;
+    `gridsize` and `value_range` shape the densities as in
+    `_compute_densities`. Rows with missing values, or with zero or missing
+    frequency `weights`, are dropped. With `cache`, results are looked up in and stored to the
+    module-level LRU cache; callables for `bw` cannot be fingerprinted and
+    are never cached. With `n_jobs`, blocks of cells are computed on a
+    thread pool; every statistic depends only on its own cell, so the result
+    is identical. With `compact`, the values are partitioned
+    `_COMPACT_CHUNK` rows at a time and exact box statistics are found by
+    selection cell by cell, which gives the same quartiles without sorting
+    all of the values at once.
+    """
+    # Missing values belong to no cell
+    missing = np.isnan(values)
+    if missing.any():
+        keys = np.where(missing, -1, keys)
+    if weights is not None:
+        if (weights < 0).any():
+            raise ValueError("`weights` must not be negative")
+        keys = np.where(weights > 0, keys, -1)
+
+    key = None
+    if cache and not callable(bw):
+        params = (n_cells, bw, cut, engine, whis, box_method, max_fliers, gridsize, value_range, compact)
+        key = _fingerprint(values, keys, *params, weights=weights)
+        stats = _stats_cache.get(key)
+        if stats is not None:
+            return stats
+
+    sorted_weights = None
+    chunk = _COMPACT_CHUNK if compact else None
+    if weights is None:
+        sorted_values, bounds = _partition(values, keys, n_cells, chunk=chunk)
+    else:
+        sorted_values, bounds, sorted_weights = _partition(values, keys, n_cells, weights, chunk)
+    if compact and box_method == "exact":
+        box_method = "select"
+
+    def compute(block):
+        start, stop = block
+        return _block_statistics(
+            sorted_values[bounds[start] : bounds[stop]],
+            bounds[start : stop + 1] - bounds[start],
+            bw,
+            cut,
+            engine,
+            whis,
+            box_method,
+            max_fliers,
+            gridsize,
+            value_range,
+            None if weights is None else sorted_weights[bounds[start] : bounds[stop]],
+        )
+
+    blocks = _cell_blocks(bounds, _n_workers(n_jobs))
+    if len(blocks) == 1:
+        parts = [compute(blocks[0])]
+    else:
+        with ThreadPoolExecutor(len(blocks)) as pool:
+            parts = list(pool.map(compute, blocks))
+    moments, supports, densities, peaks, box = _merge_blocks(parts)
+
+    # Means and standard errors for the point layer
+    counts, _, _, means, std = moments
+    sems = std / np.sqrt(counts)
+
+    stats = _CellStats(counts, sorted_values, bounds, supports, densities, box, means, sems, sorted_weights, peaks)
+    if key is not None:
+        _stats_cache.put(key, stats)
+
+    return stats
+
+
+def _block_statistics(
+    values, bounds, bw, cut, engine, whis, box_method, max_fliers, gridsize=100, value_range=None, weights=None
+):
+    """
+    Moments, densities and box statistics of contiguous cells
+    """
+    moments = _group_moments(values, bounds, weights)
+
+    # Estimate the densities of all cells in one batched pass
+    supports, densities = _compute_densities(
+        values, bounds, bw, cut, gridsize, engine, moments, value_range, weights
+    )
+    peaks = densities.max(axis=1)
+    if value_range is not None:
+        peaks = _unclipped_peaks(values, bounds, bw, cut, gridsize, engine, moments, value_range, weights, peaks)
+
+    # Compute the box statistics of all cells at once
+    box = None if whis is None else _box_stats(values, bounds, whis, box_method, max_fliers, weights)
+
+    return moments, supports, densities, peaks, box
+
+
+def _unclipped_peaks(values, bounds, bw, cut, gridsize, engine, moments, value_range, weights, peaks):
+    """
+    Largest density of each cell over its support before clipping to `value_range`
+
+    Only the clipped cells are evaluated again, on the grid they would have
+    without `value_range`, so that a clipped violin keeps the width scale of
+    the full one. `peaks` holds the largest clipped densities.
+    """
+    counts, vmin, vmax, mean, std = moments
+    clipped = (vmin - cut * std < value_range[0]) | (vmax + cut * std > value_range[1])
+    clipped &= ~np.isnan(peaks)
+    if not clipped.any():
+        return peaks
+
+    # Cells with a zero count get no density, so only the clipped ones are estimated
+    moments = (np.where(clipped, counts, 0), vmin, vmax, mean, std)
+    _, densities = _compute_densities(values, bounds, bw, cut, gridsize, engine, moments, None, weights)
+    return np.where(clipped, densities.max(axis=1), peaks)
+
+
+def _n_workers(n_jobs):
+    """
+    Number of threads for `n_jobs`, where -1 means one per CPU
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(os.cpu_count() + 1 + n_jobs, 1)
+    return max(n_jobs, 1)
+
+
+def _cell_blocks(bounds, n_blocks):
+    """
+    Split the cells into at most `n_blocks` ranges holding similar numbers of values
+    """
+    n_cells = len(bounds) - 1
+    if n_blocks <= 1 or n_cells <= 1:
+        return [(0, n_cells)]
+
+    cuts = np.searchsorted(bounds, np.linspace(0, bounds[-1], n_blocks + 1)[1:-1])
+    edges = np.unique(np.concatenate([[0], np.clip(cuts, 0, n_cells), [n_cells]]))
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _merge_blocks(parts):
+    """
+    Concatenate the `_block_statistics` of consecutive blocks of cells
+    """
+    if len(parts) == 1:
+        return parts[0]
+
+    moments, supports, densities, peaks, boxes = zip(*parts)
+    moments = tuple(np.concatenate(arrays) for arrays in zip(*moments))
+    box = None
+    if boxes[0] is not None:
+        box = {key: np.concatenate([b[key] for b in boxes]) for key in _BOX_STAT_KEYS + ("fliers",)}
+        offsets = np.cumsum([0] + [b["flier_bounds"][-1] for b in boxes[:-1]])
+        box["flier_bounds"] = np.concatenate(
+            [[0]] + [b["flier_bounds"][1:] + offset for b, offset in zip(boxes, offsets)]
+        )
+    return moments, np.concatenate(supports), np.concatenate(densities), np.concatenate(peaks), box
+
+
+# Columns of a RainCloud summary table; the optional ones may be omitted
+SUMMARY_COLUMNS = ("n", "mean", "sem", "support", "density", "q1", "med", "q3", "whislo", "whishi", "fliers", "rain")
+_OPTIONAL_SUMMARY_COLUMNS = ("sem", "fliers", "rain")
+
+
+def summarize_raincloud(
+    data,
+    x=None,
+    y=None,
+    hue=None,
+    order=None,
+    hue_order=None,
+    bw="scott",
+    cut=2,
+    kde_engine="exact",
+    whis=1.5,
+    rain_sample=1000,
+    box_method="exact",
+    max_fliers=None,
+    n_jobs=None,
+    random_state=None,
+    weights=None,
+    compact=False,
+):
+    """
+    Reduce long-form data to the per-cell statistics RainCloud draws
+
+    The result can be computed wherever the raw rows live and passed as
+    ``RainCloud(..., summary=table)`` on a plotting host that never sees them.
+    Tables built elsewhere (e.g. in a database or Spark job) must follow the
+    same layout.
+
+    Parameters
+    ----------
+    data : DataFrame
+        Long-form (tidy) dataset.
+    x, y, hue, order, hue_order : see `RainCloud`
+    bw, cut, kde_engine : see `RainCloud`
+        Density parameters.
+    whis : float
+        Whisker reach in IQRs, as in `Axes.boxplot`.
+    rain_sample : int
+        Largest number of observations kept per cell for the rain layer.
+    box_method, max_fliers, n_jobs, random_state, weights, compact : see `RainCloud`
+
+    Returns
+    -------
+    summary : DataFrame
+        One row per non-empty cell with the categorical (and hue) column and
+        `SUMMARY_COLUMNS`: the count ``n``; ``mean`` and ``sem``; the density
+        curve as arrays ``support`` and ``density`` (None without one); the
+        box statistics ``q1``, ``med``, ``q3``, ``whislo`` and ``whishi``; an
+        array of ``fliers``; and a random ``rain`` sample. The ``sem``,
+        ``fliers`` and ``rain`` columns are optional.
+    """
+    categorical_var, value_var = _split_variables(x, y)
+    categories = _levels(data, categorical_var, order)
+    hue_levels = [None] if hue is None else _levels(data, hue, hue_order)
+    n_hue = len(hue_levels)
+
+    keys = _cell_keys(data, categorical_var, categories, hue, hue_levels, compact)
+    stats = _cell_statistics(
+        _value_column(data, value_var, np.float32 if compact else float),
+        keys,
+        len(categories) * n_hue,
+        bw,
+        cut,
+        kde_engine,
+        whis,
+        box_method=box_method,
+        max_fliers=max_fliers,
+        n_jobs=n_jobs,
+        weights=None if weights is None else _value_column(data, weights),
+        compact=compact,
+    )
+
+    rng = np.random if random_state is None else np.random.default_rng(random_state)
+    return _summary_table(stats, [(categorical_var, categories), (hue, hue_levels)], rain_sample, rng)
+
+
+def _summary_table(stats, labels, rain_sample=None, rng=np.random):
+    """
+    Summary table of `stats`, whose cells run over the product of `labels`
+
+    `labels` lists ``(column, levels)`` pairs, outermost first; a pair whose
+    column is None (such as a missing hue) has a single level and is left
+    out of the table. Without `rain_sample` the rain keeps every observation.
+    """
+    values, bounds = stats.values, stats.bounds
+    if stats.weights is not None:
+        budgets = stats.counts if rain_sample is None else np.minimum(stats.counts, rain_sample)
+        values, bounds = _weighted_rain(values, stats.weights, bounds, budgets, rng)
+
+    shape = [len(levels) for _, levels in labels]
+    rows = []
+    for k in np.flatnonzero(stats.counts):
+        indices = np.unravel_index(k, shape)
+        row = {column: levels[i] for (column, levels), i in zip(labels, indices) if column is not None}
+        row.update(n=stats.counts[k], mean=stats.means[k], sem=stats.sems[k])
+
+        has_density = not np.isnan(stats.densities[k][0])
+        row["support"] = stats.supports[k].copy() if has_density else None
+        row["density"] = stats.densities[k].copy() if has_density else None
+        row.update({key: stats.box[key][k] for key in ("q1", "med", "q3", "whislo", "whishi")})
+        row["fliers"] = _cell_box_stats(stats.box, k)["fliers"].copy()
+
+        # Keep a random subset of the observations, in their original order
+        cell_values = values[bounds[k] : bounds[k + 1]]
+        if rain_sample is not None and len(cell_values) > rain_sample:
+            cell_values = cell_values[np.sort(rng.choice(len(cell_values), rain_sample, replace=False))]
+        row["rain"] = cell_values.copy()
+        rows.append(row)
+
+    columns = [column for column, _ in labels if column is not None] + list(SUMMARY_COLUMNS)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _stats_from_summary(summary, keys, n_cells):
+    """
+    Cell statistics from a summary table whose rows belong to cells `keys`
+    """
+    missing = set(SUMMARY_COLUMNS) - set(_OPTIONAL_SUMMARY_COLUMNS) - set(summary.columns)
+    if missing:
+        raise ValueError(f"`summary` is missing the columns {sorted(missing)}")
+
+    rows = np.flatnonzero(keys >= 0)
+    rows = rows[np.argsort(keys[rows], kind="stable")]
+    cells = keys[rows]
+
+    def column(name, default=np.nan):
+        values = np.full(n_cells, default, dtype=float)
+        if name in summary:
+            values[cells] = summary[name].to_numpy(dtype=float)[rows]
+        return values
+
+    def arrays(name):
+        # Per-cell arrays in cell order, concatenated, with their bounds
+        pieces = [np.empty(0)] * n_cells
+        if name in summary:
+            for k, piece in zip(cells, summary[name].to_numpy()[rows]):
+                pieces[k] = np.asarray([] if piece is None else piece, dtype=float).ravel()
+        bounds = np.concatenate([[0], np.cumsum([len(piece) for piece in pieces], dtype=np.intp)])
+        return np.concatenate(pieces), bounds
+
+    counts = column("n", 0).astype(np.intp)
+    means, sems = column("mean"), column("sem")
+
+    # Density curves, resampled onto a common number of points where they differ
+    curves = {}
+    for k, support, density in zip(cells, summary["support"].to_numpy()[rows], summary["density"].to_numpy()[rows]):
+        if support is not None and density is not None and len(support) >= 2:
+            curves[k] = np.asarray(support, dtype=float), np.asarray(density, dtype=float)
+    gridsize = max([len(support) for support, _ in curves.values()], default=2)
+    supports = np.full((n_cells, gridsize), np.nan)
+    densities = np.full((n_cells, gridsize), np.nan)
+    for k, (support, density) in curves.items():
+        supports[k] = np.linspace(support[0], support[-1], gridsize)
+        densities[k] = np.interp(supports[k], support, density)
+
+    # Box statistics in the layout of `_box_stats`
+    box = {key: column(key) for key in ("q1", "med", "q3", "whislo", "whishi")}
+    box["mean"] = means
+    box["iqr"] = box["q3"] - box["q1"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        box["cilo"] = box["med"] - 1.57 * box["iqr"] / np.sqrt(counts)
+        box["cihi"] = box["med"] + 1.57 * box["iqr"] / np.sqrt(counts)
+    box["fliers"], box["flier_bounds"] = arrays("fliers")
+
+    values, bounds = arrays("rain")
+    return _CellStats(counts, values, bounds, supports, densities, box, means, sems)
+
+
+class _QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch
+
+    Items live in compactors of increasing weight ``2**h``. A compactor that
+    outgrows its capacity sorts itself and promotes every other item (from a
+    random offset) to the next level, so memory stays at about ``3 * k`` items
+    while the rank error of any quantile is a small multiple of ``n / k``.
+    Until the first compaction the sketch holds every item and is exact.
+    """
+
+    __slots__ = ("k", "levels", "rng")
+
+    def __init__(self, k=1024, rng=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def _capacity(self, h):
+        # Lower levels shrink geometrically, as in KLL
+        return max(8, int(self.k * (2.0 / 3) ** (len(self.levels) - 1 - h)))
+
+    def update(self, values):
+        # Feed large inputs in blocks so that no compaction sorts all of them
+        block = 64 * self.k
+        for start in range(0, max(len(values), 1), block):
+            self.levels[0] = np.concatenate([self.levels[0], values[start : start + block]])
+            self._compress()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) > self._capacity(h):
+                items = np.sort(self.levels[h])
+                if len(items) % 2:
+                    # Keep one item back so the promoted weight is exact
+                    self.levels[h], items = items[-1:], items[:-1]
+                else:
+                    self.levels[h] = np.empty(0)
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[self.rng.integers(2) :: 2]])
+            h += 1
+
+    def items(self):
+        """
+        Retained items in sorted order with their weights
+        """
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0**h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, q):
+        """
+        Estimated quantiles `q` (in [0, 1]), linearly interpolated like np.percentile
+        """
+        items, weights = self.items()
+        if len(self.levels) == 1:
+            return np.percentile(items, np.asarray(q) * 100)
+
+        # Interpolate between the midpoints of each item's rank range
+        ranks = np.cumsum(weights) - weights / 2
+        return np.interp(np.asarray(q) * weights.sum(), ranks, items)
+
+
+class _StreamingCell:
+    """
+    Bounded-memory statistics of one (category, hue) cell
+
+    Holds the running count, mean and sum of squares (Chan et al.'s parallel
+    update), the exact extremes, a histogram of `n_bins` bins whose range
+    doubles to cover new values, a `_QuantileSketch` and a uniform reservoir
+    sample of the observations (algorithm R).
+    """
+
+    __slots__ = ("n", "mean", "m2", "vmin", "vmax", "lo", "width", "hist", "sketch", "reservoir", "rng")
+
+    def __init__(self, n_bins, sketch_size, rain_sample, rng):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+        self.vmin, self.vmax = np.inf, -np.inf
+        self.lo, self.width = None, None
+        self.hist = np.zeros(n_bins)
+        self.sketch = _QuantileSketch(sketch_size, rng)
+        self.reservoir = np.empty(rain_sample)
+        self.rng = rng
+
+    def update(self, values):
+        n = len(values)
+        mean = values.mean()
+        delta = mean - self.mean
+        total = self.n + n
+        self.m2 += ((values - mean) ** 2).sum() + delta**2 * self.n * n / total
+        self.mean += delta * n / total
+        self.vmin = min(self.vmin, values.min())
+        self.vmax = max(self.vmax, values.max())
+
+        self._update_hist(values)
+        self.sketch.update(values)
+        self._update_reservoir(values)
+        self.n = total
+
+    def _update_hist(self, values):
+        n_bins = len(self.hist)
+        if self.lo is None:
+            span = self.vmax - self.vmin
+            self.lo, self.width = self.vmin, (span if span > 0 else max(abs(self.vmin), 1.0) * 1e-9) / n_bins
+
+        # Double the bin width, merging pairs of bins, until the range covers the data
+        while self.vmin < self.lo or self.vmax > self.lo + n_bins * self.width:
+            merged = self.hist.reshape(-1, 2).sum(axis=1)
+            self.hist = np.zeros(n_bins)
+            if self.vmin < self.lo:
+                self.hist[n_bins // 2 :] = merged
+                self.lo -= n_bins * self.width
+            else:
+                self.hist[: n_bins // 2] = merged
+            self.width *= 2
+
+        index = np.minimum(((values - self.lo) / self.width).astype(np.intp), n_bins - 1)
+        self.hist += np.bincount(index, minlength=n_bins)
+
+    def _update_reservoir(self, values):
+        size = len(self.reservoir)
+        seen = self.n + np.arange(len(values))
+
+        # The first `size` observations fill the reservoir in order
+        filling = seen < size
+        self.reservoir[seen[filling]] = values[filling]
+
+        # Each later one replaces a random slot with probability size / (seen + 1)
+        slots = self.rng.integers(0, seen[~filling] + 1) if (~filling).any() else np.empty(0, np.intp)
+        keep = slots < size
+        slots, replacements = slots[keep], values[~filling][keep]
+        # Later observations win when several land on the same slot
+        last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+        self.reservoir[slots[last]] = replacements[last]
+
+    def sample(self):
+        return self.reservoir[: min(self.n, len(self.reservoir))].copy()
+
+    def summary(self, bw, cut, gridsize, whis):
+        """
+        One row of a summary table, see `summarize_raincloud`
+        """
+        std = np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+        row = {"n": self.n, "mean": self.mean, "sem": std / np.sqrt(self.n)}
+
+        # Density from the histogram, treating each bin as mass at its centre
+        row["support"] = row["density"] = None
+        if self.n >= 2 and std > 0:
+            support = np.linspace(self.vmin - cut * std, self.vmax + cut * std, gridsize)
+            centers = self.lo + (np.arange(len(self.hist)) + 0.5) * self.width
+            bandwidth = _rule_factors(self.n, bw) * std
+            row["support"] = support
+            row["density"] = _kde_binned(centers, support, bandwidth, weights=self.hist)
+
+        # Box from the sketch; the whiskers reach the most extreme retained
+        # observation inside the fences, and the fliers are the exact extremes
+        # plus the rain sample outside the whiskers
+        q1, med, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        candidates = np.concatenate([self.sketch.items()[0], self.sample(), [self.vmin, self.vmax]])
+        inside = candidates[(candidates >= q1 - whis * iqr) & (candidates <= q3 + whis * iqr)]
+        whislo = min(inside.min(), q1) if len(inside) else q1
+        whishi = max(inside.max(), q3) if len(inside) else q3
+        candidates = np.unique(np.concatenate([self.sample(), [self.vmin, self.vmax]]))
+        row.update(q1=q1, med=med, q3=q3, whislo=whislo, whishi=whishi)
+        row["fliers"] = candidates[(candidates < whislo) | (candidates > whishi)]
+        row["rain"] = self.sample()
+        return row
+
+
+class RainCloudAccumulator:
+    """
+    Build RainCloud statistics from data that arrive in chunks
+
+    Each chunk is folded into bounded per-cell state (see `_StreamingCell`),
+    so the memory used depends on the number of cells and the size
+    parameters, not on the number of rows. `summary` turns the state into a
+    table for ``RainCloud(summary=...)``.
+
+    Parameters
+    ----------
+    x, y, hue, order, hue_order : see `RainCloud`
+        Without `order` or `hue_order` the levels are listed in order of
+        first appearance across chunks.
+    n_bins : int
+        Histogram bins per cell from which the densities are estimated.
+    sketch_size : int
+        Accuracy parameter of the per-cell quantile sketches for the boxes;
+        quartiles are exact until a cell exceeds it.
+    rain_sample : int
+        Size of the uniform sample kept per cell for the rain layer.
+    random_state : int or numpy.random.Generator
+        Seed for the sketches and samples.
+
+    Examples
+    --------
+    >>> acc = RainCloudAccumulator(x="group", y="value")
+    >>> for chunk in pd.read_csv("values.csv", chunksize=10**6):
+    ...     acc.update(chunk)
+    >>> RainCloud(x="group", y="value", summary=acc.summary())
+    """
+
+    def __init__(
+        self,
+        x=None,
+        y=None,
+        hue=None,
+        order=None,
+        hue_order=None,
+        n_bins=4096,
+        sketch_size=1024,
+        rain_sample=1000,
+        random_state=None,
+    ):
+        if n_bins < 2 or n_bins % 2:
+            raise ValueError(f"`n_bins` must be a positive even number, got {n_bins!r}")
+
+        self.categorical_var, self.value_var = _split_variables(x, y)
+        self.hue = hue
+        self.categories = None if order is None else list(order)
+        self.hue_levels = [None] if hue is None else None if hue_order is None else list(hue_order)
+        self._discover = (order is None, hue is not None and hue_order is None)
+        self.n_bins, self.sketch_size, self.rain_sample = n_bins, sketch_size, rain_sample
+        self._rng = np.random.default_rng(random_state)
+        self._cells = {}
+
+    def update(self, chunk):
+        """
+        Fold a chunk, in any format accepted by `RainCloud`, into the statistics
+        """
+        # Append levels not seen in earlier chunks
+        if self._discover[0]:
+            self.categories = _extend_levels(self.categories, _column(chunk, self.categorical_var))
+        if self._discover[1]:
+            self.hue_levels = _extend_levels(self.hue_levels, _column(chunk, self.hue))
+
+        n_hue = len(self.hue_levels)
+        keys = _cell_keys(chunk, self.categorical_var, self.categories, self.hue, self.hue_levels)
+        values = _value_column(chunk, self.value_var)
+
+        # Missing values would poison the running statistics
+        keys[np.isnan(values)] = -1
+        n_cells = len(self.categories) * n_hue
+        sorted_values, bounds = _partition(values, keys, n_cells)
+        for k in np.flatnonzero(np.diff(bounds)):
+            cell = divmod(k, n_hue)
+            if cell not in self._cells:
+                self._cells[cell] = _StreamingCell(self.n_bins, self.sketch_size, self.rain_sample, self._rng)
+            self._cells[cell].update(sorted_values[bounds[k] : bounds[k + 1]])
+
+        return self
+
+    def summary(self, bw="scott", cut=2, gridsize=100, whis=1.5):
+        """
+        Summary table of the data seen so far, see `summarize_raincloud`
+
+        `bw` must be a rule name or a scalar factor; callables need the raw data.
+        """
+        if _rule_factors(1, bw) is None:
+            raise ValueError(f"`bw` must be 'scott', 'silverman' or a number, got {bw!r}")
+
+        rows = []
+        for i, j in sorted(self._cells):
+            row = {self.categorical_var: self.categories[i]}
+            if self.hue is not None:
+                row[self.hue] = self.hue_levels[j]
+            row.update(self._cells[i, j].summary(bw, cut, gridsize, whis))
+            rows.append(row)
+
+        columns = [self.categorical_var] + ([] if self.hue is None else [self.hue]) + list(SUMMARY_COLUMNS)
+        return pd.DataFrame(rows, columns=columns)
+
+
+def _extend_levels(levels, column):
+    """
+    `levels` followed by the values of `column` not among them, in order of appearance
+    """
+    levels = [] if levels is None else levels
+    new = pd.Index(pd.unique(column)).dropna().difference(levels, sort=False)
+    return levels + list(new)
+
+
+def _draw_half_violin(
+    ax,
+    data,
+    position,
+    width,
+    orient,
+    color,
+    alpha=None,
+    bw_adjust=1,
+    cut=2,
+    engine="exact",
+    density=None,
+    scale=None,
+    peak=None,
+):
+    """
+    Draw a half violin plot (KDE plot)
+
+    `density` is an optional precomputed ``(support, density)`` pair, as
+    returned row-wise by `compute_densities`; `scale` simplifies the outline
+    and `peak` sets its width scale, see `_violin_vertices`. Axis limits are left to the caller, which sets
+    them once for all violins.
+    """
+    # Calculate KDE over a slightly extended range of data unless given
+    if density is None:
+        if len(data) < 2:
+            return None
+        density = _kde(data, bw_adjust, cut, engine=engine)
+    if density is None or np.isnan(density[1][0]):
+        return None
+    vertices = _violin_vertices(*density, position, width, scale, peak)
+
+    # Create polygon and draw
+    poly = PolyCollection([vertices], facecolor=color, edgecolor="none", alpha=alpha)
+    ax.add_collection(poly)
+
+    return poly
+
+
+def _box_props(color, alpha=None, **kwargs):
+    """
+    Resolve the box, flier, whisker and cap properties used by RainCloud
+
+    Returns the four property dicts followed by the remaining keyword arguments.
+    """
+    # Remove parameters that can't be passed to boxplot
+    kwargs.pop("saturation", None)
+
+    # Set boxplot properties
+    boxprops = dict(kwargs.pop("boxprops", {"facecolor": "none", "edgecolor": "black"}))
+    boxprops["facecolor"] = color
+    boxprops["alpha"] = alpha
+
+    # Set flier (outlier) marker properties - reduce size by 1/2
+    flierprops = dict(kwargs.pop("flierprops", {}))
+    flierprops.setdefault("marker", "o")
+    flierprops.setdefault("markerfacecolor", color)
+    flierprops.setdefault("markeredgecolor", "black")
+    flierprops.setdefault("markersize", 3)  # Reduced from default ~6 to 3 (1/2 size)
+    flierprops.setdefault("alpha", alpha)
+
+    # Set whisker properties - reduce cap size by 2/3 of current size
+    whiskerprops = {}
+    whiskerprops["linewidth"] = 0.7  # Further reduced from 1.0 to 0.7 (2/3 of current size)
+
+    # Set cap properties - reduce width by 2/3 of current size
+    capprops = {}
+    capprops["linewidth"] = 0.7  # Further reduced from 1.0 to 0.7 (2/3 of current size)
+
+    # Override any user-provided properties
+    user_whiskerprops = kwargs.pop("whiskerprops", {})
+    user_capprops = kwargs.pop("capprops", {})
+    whiskerprops.update(user_whiskerprops)
+    capprops.update(user_capprops)
+
+    return boxprops, flierprops, whiskerprops, capprops, kwargs
+
+
+def _lerp(a, b, t):
+    """
+    Linear interpolation between order statistics, as np.percentile does
+    """
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def _box_stats(values, bounds, whis=1.5, method="exact", max_fliers=None, weights=None):
+    """
+    Box plot statistics of every contiguous group, as in cbook.boxplot_stats
+
+    With `method` "exact", quartiles use NumPy's linear interpolation on one
+    sort of all groups, and whiskers and fliers come from vectorized
+    comparisons against the fences. "select" and "sketch" handle one group at
+    a time in linear time, see `_select_box_stats`. `max_fliers` thins the
+    fliers of each group, see `_thin_fliers`. Frequency `weights` always use
+    the exact method, interpolating between the observations the weights
+    stand for; fliers are listed once per row.
+
+    Returns
+    -------
+    stats : dict
+        Per-group arrays "mean", "med", "q1", "q3", "iqr", "cilo", "cihi",
+        "whislo" and "whishi" (NaN for empty groups), plus "fliers" holding
+        the outliers of all groups and "flier_bounds" delimiting them:
+        group `k` owns ``fliers[flier_bounds[k]:flier_bounds[k + 1]]``.
+    """
+    counts = np.diff(bounds)
+    n_groups = len(counts)
+    stats = {key: np.full(n_groups, np.nan) for key in _BOX_STAT_KEYS}
+    if method != "exact" and weights is None:
+        return _select_box_stats(values, bounds, whis, method, max_fliers, stats)
+
+    # Sort within each group; the groups themselves are already contiguous
+    owner = np.repeat(np.arange(n_groups), counts)
+    order = np.lexsort((values, owner))
+    ordered = values[order]
+
+    groups = np.flatnonzero(counts > 0)
+    n, starts = counts[groups], bounds[:-1][groups]
+
+    if weights is None:
+        size, weighted = n, ordered
+
+        def quantile(p):
+            virtual = (n - 1) * p
+            below = np.floor(virtual).astype(np.intp)
+            above = np.minimum(below + 1, n - 1)
+            return _lerp(ordered[starts + below], ordered[starts + above], virtual - below)
+
+    else:
+        # Observation `r` of a group is the first value whose cumulative weight exceeds `r`
+        ordered_weights = weights[order]
+        cumulative = np.cumsum(ordered_weights)
+        preceding = np.concatenate([[0], cumulative])[starts]
+        size = np.concatenate([[0], cumulative])[starts + n] - preceding
+        weighted = ordered * ordered_weights
+
+        def quantile(p):
+            virtual = (size - 1) * p
+            below = np.floor(virtual)
+            above = np.minimum(below + 1, size - 1)
+            lower = ordered[np.searchsorted(cumulative, preceding + below, side="right")]
+            upper = ordered[np.searchsorted(cumulative, preceding + above, side="right")]
+            return _lerp(lower, upper, virtual - below)
+
+    if len(groups):
+        q1, med, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+        iqr = q3 - q1
+        stats["mean"][groups] = np.add.reduceat(weighted, starts) / size
+        stats["q1"][groups], stats["med"][groups], stats["q3"][groups] = q1, med, q3
+        stats["iqr"][groups] = iqr
+        stats["cilo"][groups] = med - 1.57 * iqr / np.sqrt(size)
+        stats["cihi"][groups] = med + 1.57 * iqr / np.sqrt(size)
+
+        # Whiskers end at the most extreme data within `whis` IQRs of the box
+        n_below = np.add.reduceat(ordered < np.repeat(q1 - whis * iqr, n), starts, dtype=np.intp)
+        n_within = np.add.reduceat(ordered <= np.repeat(q3 + whis * iqr, n), starts, dtype=np.intp)
+        whislo = np.where(n_below < n, ordered[np.minimum(starts + n_below, len(ordered) - 1)], q1)
+        whishi = np.where(n_within > 0, ordered[starts + n_within - 1], q3)
+        stats["whislo"][groups] = np.minimum(whislo, q1)
+        stats["whishi"][groups] = np.maximum(whishi, q3)
+
+    # Everything past the whiskers is a flier
+    is_flier = (ordered < np.repeat(stats["whislo"], counts)) | (ordered > np.repeat(stats["whishi"], counts))
+    stats["fliers"] = ordered[is_flier]
+    stats["flier_bounds"] = np.concatenate([[0], np.cumsum(np.bincount(owner[is_flier], minlength=n_groups))])
+
+    return _thin_fliers(stats, max_fliers)
+
+
+def _select_box_stats(values, bounds, whis, method, max_fliers, stats):
+    """
+    Fill `stats` group by group without sorting whole groups
+
+    "select" finds the order statistics around each quartile with
+    np.partition, giving the same values as a full sort; "sketch" reads the
+    quartiles off a `_QuantileSketch`. Either way the whiskers and fliers are
+    then found in one pass over the group.
+    """
+    probabilities = np.array([0.25, 0.5, 0.75])
+    fliers = []
+    for k in range(len(bounds) - 1):
+        group = values[bounds[k] : bounds[k + 1]]
+        n = len(group)
+        if n == 0:
+            fliers.append(group)
+            continue
+
+        if method == "select":
+            virtual = (n - 1) * probabilities
+            below = np.floor(virtual).astype(np.intp)
+            above = np.minimum(below + 1, n - 1)
+            part = np.partition(group, np.unique(np.concatenate([below, above])))
+            q1, med, q3 = _lerp(part[below], part[above], virtual - below)
+        else:
+            sketch = _QuantileSketch(rng=np.random.default_rng(0))
+            sketch.update(group)
+            q1, med, q3 = sketch.quantiles(probabilities)
+
+        iqr = q3 - q1
+        stats["mean"][k] = group.mean(dtype=float)
+        stats["q1"][k], stats["med"][k], stats["q3"][k], stats["iqr"][k] = q1, med, q3, iqr
+        stats["cilo"][k] = med - 1.57 * iqr / np.sqrt(n)
+        stats["cihi"][k] = med + 1.57 * iqr / np.sqrt(n)
+
+        # Whiskers end at the most extreme data within `whis` IQRs of the box
+        whislo = np.min(group, where=group >= q1 - whis * iqr, initial=np.inf)
+        whishi = np.max(group, where=group <= q3 + whis * iqr, initial=-np.inf)
+        stats["whislo"][k], stats["whishi"][k] = min(whislo, q1), max(whishi, q3)
+        fliers.append(np.sort(group[(group < stats["whislo"][k]) | (group > stats["whishi"][k])]))
+
+    stats["fliers"] = np.concatenate(fliers) if fliers else np.empty(0)
+    stats["flier_bounds"] = np.concatenate([[0], np.cumsum([len(f) for f in fliers], dtype=np.intp)])
+
+    return _thin_fliers(stats, max_fliers)
+
+
+def _thin_fliers(stats, max_fliers):
+    """
+    Keep at most `max_fliers` sorted fliers per group, at evenly spaced ranks
+
+    The choice is deterministic and always keeps both extremes.
+    """
+    counts = np.diff(stats["flier_bounds"])
+    if max_fliers is None or not (counts > max_fliers).any():
+        return stats
+
+    keep = []
+    for k, count in enumerate(counts):
+        start = stats["flier_bounds"][k]
+        if count > max_fliers:
+            keep.append(start + np.unique(np.round(np.linspace(0, count - 1, max_fliers)).astype(np.intp)))
+        else:
+            keep.append(np.arange(start, start + count))
+    keep = np.concatenate(keep)
+
+    stats["fliers"] = stats["fliers"][keep]
+    stats["flier_bounds"] = np.concatenate([[0], np.cumsum(np.minimum(counts, max_fliers))])
+    return stats
+
+
+def _cell_box_stats(stats, k):
+    """
+    Statistics of group `k` in the dict format expected by `Axes.bxp`
+    """
+    cell = {key: stats[key][k] for key in _BOX_STAT_KEYS}
+    cell["fliers"] = stats["fliers"][stats["flier_bounds"][k] : stats["flier_bounds"][k + 1]]
+    return cell
+
+
+def _draw_box(ax, data, position, width, color, alpha=None, stats=None, **kwargs):
+    """
+    Draw a boxplot
+
+    `stats` optionally holds precomputed statistics for `Axes.bxp`, as
+    returned by `_cell_box_stats`; otherwise they are computed from `data`.
+    """
+    if len(data) < 1 and stats is None:
+        return None
+
+    boxprops, flierprops, whiskerprops, capprops, kwargs = _box_props(color, alpha, **kwargs)
+
+    if stats is not None:
+        # Draw straight from the statistics; bxp spells `notch` differently
+        kwargs.pop("whis", None)
+        if "notch" in kwargs:
+            kwargs["shownotches"] = kwargs.pop("notch")
+        return ax.bxp(
+            [stats],
+            positions=[position],
+            widths=width,
+            patch_artist=True,
+            boxprops=boxprops,
+            flierprops=flierprops,
+            whiskerprops=whiskerprops,
+            capprops=capprops,
+            **kwargs,
+        )
+
+    # Create the boxplot with our specific properties
+    box = ax.boxplot(
+        [data],
+        positions=[position],
+        widths=width,
+        vert=True,
+        patch_artist=True,
+        boxprops=boxprops,
+        flierprops=flierprops,
+        whiskerprops=whiskerprops,
+        capprops=capprops,
+        **kwargs,
+    )
+
+    return box
+
+
+def _move_box(box, stats, position):
+    """
+    Move the artists of a non-notched `Axes.bxp` box to new statistics
+    """
+    q1, q3 = stats["q1"], stats["q3"]
+
+    # The rectangle runs q1, q1, q3, q3, q1 (and closes on q1)
+    patch = box["boxes"][0]
+    vertices = patch.get_path().vertices
+    vertices[:, 1] = np.resize([q1, q1, q3, q3, q1], len(vertices))
+    patch.stale = True
+
+    for line, low, high in zip(box["whiskers"], (q1, q3), (stats["whislo"], stats["whishi"])):
+        line.set_ydata([low, high])
+    for line, value in zip(box["caps"], (stats["whislo"], stats["whishi"])):
+        line.set_ydata([value, value])
+    for key, value in (("medians", stats["med"]), ("means", stats["mean"])):
+        for line in box.get(key, []):
+            line.set_ydata(np.full(len(line.get_ydata()), value))
+    for line in box["fliers"]:
+        line.set_data(np.full(len(stats["fliers"]), position), stats["fliers"])
+
+
+def _line_props(subkey, props):
+    """
+    LineCollection keywords for a box element, merged over the boxplot rcParams
+    """
+    prefix = f"boxplot.{subkey}props"
+    merged = {key.split(".")[-1]: value for key, value in mpl.rcParams.items() if key.startswith(prefix)}
+    merged.update(cbook.normalize_kwargs(props, mlines.Line2D))
+    return dict(
+        colors=merged.get("color"),
+        linewidths=merged.get("linewidth"),
+        linestyles=merged.get("linestyle"),
+        alpha=merged.get("alpha"),
+        capstyle=mpl.rcParams["lines.solid_capstyle"],
+    )
+
+
+def _draw_box_collection(ax, stats, cells, positions, width, colors, alpha=None, **kwargs):
+    """
+    Draw the boxes of many cells as a handful of collections
+
+    Row ``cells[i]`` of `stats` (see `_box_stats`) is drawn at ``positions[i]``
+    in ``colors[i]``: one PolyCollection holds every box, LineCollections hold
+    the whiskers, caps and medians, and one marker line per color holds the
+    fliers.
+    Returns a dict of these artists, keyed like the output of `Axes.bxp`.
+    """
+    kwargs.pop("whis", None)
+    showfliers = kwargs.pop("showfliers", True)
+    showcaps = kwargs.pop("showcaps", True)
+    medianprops = kwargs.pop("medianprops", {})
+    boxprops, flierprops, whiskerprops, capprops, kwargs = _box_props(None, alpha, **kwargs)
+
+    cells = np.asarray(cells, dtype=np.intp)
+    positions = np.asarray(positions, dtype=float)
+    rgba = mcolors.to_rgba_array(colors)
+    q1, q3, med, whislo, whishi = (stats[key][cells] for key in ("q1", "q3", "med", "whislo", "whishi"))
+    left, right = positions - width * 0.5, positions + width * 0.5
+    zorder = mlines.Line2D.zorder
+    artists = {}
+
+    # Boxes
+    boxprops = cbook.normalize_kwargs(boxprops, mpatches.Patch)
+    corners = np.stack([left, q1, right, q1, right, q3, left, q3], axis=1).reshape(-1, 4, 2)
+    artists["boxes"] = PolyCollection(
+        corners,
+        facecolors=rgba,
+        edgecolors=boxprops.get("edgecolor", mpl.rcParams["boxplot.boxprops.color"]),
+        linewidths=boxprops.get("linewidth", mpl.rcParams["boxplot.boxprops.linewidth"]),
+        linestyles=boxprops.get("linestyle", mpl.rcParams["boxplot.boxprops.linestyle"]),
+        alpha=boxprops.get("alpha"),
+        joinstyle="miter",
+        zorder=zorder,
+    )
+
+    # Whiskers run from the box to the whisker ends
+    whiskers = np.stack([positions, q1, positions, whislo, positions, q3, positions, whishi], axis=1)
+    artists["whiskers"] = LineCollection(
+        whiskers.reshape(-1, 2, 2), zorder=zorder, **_line_props("whisker", whiskerprops)
+    )
+
+    # Caps are half as wide as the boxes
+    if showcaps:
+        cap_left, cap_right = positions - width * 0.25, positions + width * 0.25
+        caps = np.stack([cap_left, whislo, cap_right, whislo, cap_left, whishi, cap_right, whishi], axis=1)
+        artists["caps"] = LineCollection(caps.reshape(-1, 2, 2), zorder=zorder, **_line_props("cap", capprops))
+
+    # Medians sit slightly above the other box elements
+    medians = np.stack([left, med, right, med], axis=1)
+    artists["medians"] = LineCollection(
+        medians.reshape(-1, 2, 2), zorder=zorder + 0.1, **_line_props("median", medianprops)
+    )
+
+    for artist in artists.values():
+        ax.add_collection(artist)
+
+    # Fliers as one marker line per color, styled exactly like those of bxp
+    if showfliers:
+        flier_kw = {
+            key.split(".")[-1]: value for key, value in mpl.rcParams.items() if key.startswith("boxplot.flierprops")
+        }
+        flier_kw.update(cbook.normalize_kwargs(flierprops, mlines.Line2D))
+        flier_kw.update(zorder=zorder, label="_nolegend_")
+        artists["fliers"] = []
+        for color in dict.fromkeys(map(tuple, rgba)):
+            same = np.flatnonzero((rgba == color).all(axis=1))
+            start, stop = stats["flier_bounds"][cells[same]], stats["flier_bounds"][cells[same] + 1]
+            flier_y = np.concatenate([stats["fliers"][a:b] for a, b in zip(start, stop)])
+            line_kw = dict(flier_kw)
+            if line_kw["markerfacecolor"] is None:
+                line_kw["markerfacecolor"] = color
+            (line,) = ax.plot(np.repeat(positions[same], stop - start), flier_y, **line_kw)
+            artists["fliers"].append(line)
+
+    return artists
+
+
+def _rain_layout(
+    values, bounds, positions, jitter, jitter_range=0.05, max_points=None, rng=np.random, supports=None, densities=None
+):
+    """
+    Rain coordinates of every cell, jittered by a single random draw
+
+    Cell `k` rains ``values[bounds[k]:bounds[k + 1]]`` at `positions[k]`,
+    keeping a random subset of at most ``max_points[k]`` of them (in their
+    original order) if given. With `jitter` "density" each offset is scaled
+    by the cell's relative density (`supports`, `densities`) at its value.
+
+    Returns the x and y coordinates and the bounds of each cell within them.
+    """
+    counts = np.diff(bounds)
+
+    # Keep a random subset of the observations, in their original order
+    if max_points is not None and (counts > max_points).any():
+        keep = [np.arange(bounds[k], bounds[k + 1]) for k in range(len(counts))]
+        for k in np.flatnonzero(counts > max_points):
+            keep[k] = bounds[k] + np.sort(rng.choice(counts[k], max_points[k], replace=False))
+        values = values[np.concatenate(keep)]
+        counts = np.minimum(counts, max_points)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    owner = np.repeat(np.arange(len(counts)), counts)
+    x = positions[owner]
+    if jitter:
+        # Add jitter with a uniform random distribution
+        offsets = rng.uniform(-jitter_range, jitter_range, size=len(values))
+        if isinstance(jitter, str) and jitter == "density" and supports is not None:
+            for k in np.flatnonzero(counts):
+                if not np.isnan(densities[k][0]):
+                    cell = slice(bounds[k], bounds[k + 1])
+                    offsets[cell] *= np.interp(values[cell], supports[k], densities[k]) / densities[k].max()
+        x = x + offsets
+
+    return x, values, bounds
+
+
+def _weighted_rain(values, weights, bounds, budgets, rng=np.random):
+    """
+    Rain sample of frequency-weighted cells, in proportion to the weights
+
+    Cell `k` gets about ``budgets[k]`` points: each value is repeated
+    ``floor(e + u)`` times for its expected share ``e`` of the budget and a
+    uniform ``u``, so integer weights within the budget are repeated exactly.
+
+    Returns the repeated values and the bounds of each cell among them.
+    """
+    counts = np.diff(bounds)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    sizes = np.bincount(owner, weights, len(counts))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = weights * (budgets / sizes)[owner]
+    repeats = np.floor(shares + rng.uniform(size=len(shares))).astype(np.intp)
+
+    rain_counts = np.bincount(owner, repeats, len(counts)).astype(np.intp)
+    return np.repeat(values, repeats), np.concatenate([[0], np.cumsum(rain_counts)])
+
+
+def _jitter_rain(data, position, jitter, jitter_range=0.05, max_points=None, rng=np.random, density=None):
+    """
+    Horizontal positions of the rain points of one cell, see `_rain_layout`
+
+    Returns the jittered positions and the (possibly subsampled) values.
+    """
+    supports, densities = (None, None) if density is None else ([density[0]], [density[1]])
+    x, y, _ = _rain_layout(
+        data,
+        np.array([0, len(data)]),
+        np.array([position]),
+        jitter,
+        jitter_range,
+        None if max_points is None else np.array([max_points]),
+        rng,
+        supports,
+        densities,
+    )
+    return x, y
+
+
+def _draw_strip(
+    ax,
+    data,
+    position,
+    jitter,
+    orient,
+    color,
+    size,
+    alpha=None,
+    jitter_range=0.05,
+    mode="points",
+    max_points=None,
+    positions=None,
+    **kwargs,
+):
+    """
+    Draw scatter points (rain part)
+
+    `mode` is one of `RAIN_MODES` other than "auto": "points" draws every
+    observation as a vector marker, "raster" draws them as a bitmap inside
+    vector outputs, "subsample" draws at most `max_points` randomly chosen
+    observations and "hexbin" aggregates them into a hexagonal density image.
+    `positions` optionally gives the laid-out horizontal positions of `data`
+    (see `_rain_layout`), which are then drawn as they are.
+    """
+    if len(data) < 1:
+        return None
+
+    if positions is None:
+        max_points = max_points if mode == "subsample" else None
+        positions, data = _jitter_rain(data, position, jitter, jitter_range, max_points)
+
+    if mode == "hexbin":
+        # Bin the jittered points; opacity grows with the (log) count per hexagon
+        gridsize = kwargs.pop("gridsize", (2, 40))
+        low, high = data.min(), data.max()
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        cmap = mcolors.LinearSegmentedColormap.from_list(
+            "rain", [mcolors.to_rgba(color, 0.2 * (1 if alpha is None else alpha)), mcolors.to_rgba(color, alpha)]
+        )
+        return ax.hexbin(
+            positions,
+            data,
+            gridsize=gridsize,
+            extent=(position - jitter_range, position + jitter_range, low, high),
+            bins="log",
+            mincnt=1,
+            cmap=cmap,
+            linewidths=0,
+            zorder=kwargs.get("zorder"),
+        )
+
+    # Draw the points, as a bitmap in vector outputs if requested
+    if mode == "raster":
+        kwargs["rasterized"] = True
+    points = ax.scatter(positions, data, color=color, s=size, alpha=alpha, **kwargs)
+
+    return points
+
+
+# Bytes of resampled draws held in memory at once by each bootstrap thread,
+# few enough for a chunk to stay in the CPU cache
+_BOOTSTRAP_MAX_BYTES = 2**22
+
+
+def _bootstrap_intervals(values, bounds, n_boot=1000, level=95, rng=None, weights=None, n_jobs=None, max_bytes=None):
+    """
+    Percentile bootstrap confidence intervals of the mean of every contiguous group
+
+    All groups are resampled together, see `_resample_means`: each chunk of
+    resamples draws one uniform matrix over the rows of every group, and a
+    single ``np.add.reduceat`` gives the sums of all groups at once. A chunk
+    holds at most `max_bytes` of draws (24 bytes per draw, for the uniform,
+    the index and the gathered value) and has its own child generator of
+    `rng`, so the `n_jobs` threads, each holding one chunk, give the same
+    intervals as a serial run.
+
+    With frequency `weights`, each resample draws the (rounded) total weight
+    of a group from a multinomial over its rows, so the cost follows the
+    number of rows rather than the number of observations they stand for.
+    The multinomial probabilities differ between groups, so this path still
+    resamples one group at a time, each from its own child generator.
+
+    Returns the lower and upper bounds, NaN for empty groups.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n_workers = _n_workers(n_jobs)
+    max_draws = max((_BOOTSTRAP_MAX_BYTES if max_bytes is None else max_bytes) // 24, 1)
+    percentiles = [(100 - level) / 2, (100 + level) / 2]
+
+    counts = np.diff(bounds)
+    groups = np.flatnonzero(counts)
+    lo, hi = np.full(len(counts), np.nan), np.full(len(counts), np.nan)
+    if len(groups) == 0:
+        return lo, hi
+
+    if weights is None:
+        means = _resample_means(values[: bounds[-1]], counts[groups], n_boot, rng, max_draws, n_workers)
+    else:
+        streams = rng.spawn(len(groups))
+
+        def group_means(i):
+            cell = slice(bounds[groups[i]], bounds[groups[i] + 1])
+            return _resample_weighted_means(values[cell], weights[cell], n_boot, streams[i], max_draws)
+
+        if n_workers == 1 or len(groups) <= 1:
+            means = [group_means(i) for i in range(len(groups))]
+        else:
+            with ThreadPoolExecutor(min(n_workers, len(groups))) as pool:
+                means = list(pool.map(group_means, range(len(groups))))
+        means = np.column_stack(means)
+
+    lo[groups], hi[groups] = np.percentile(means, percentiles, axis=0)
+    return lo, hi
+
+
+def _resample_means(values, counts, n_boot, rng, max_draws, n_workers=1):
+    """
+    Means of `n_boot` resamples of every group of ``counts`` consecutive `values`
+
+    The resamples × rows draws are split into tiles of at most `max_draws`:
+    chunks of resamples and, when one resample of all groups does not fit,
+    ranges of rows. Each tile maps a uniform matrix to row indices, row `r`
+    of group `c` drawing ``starts[c] + floor(u * counts[c])``, and reduces
+    the gathered values of every group with one ``np.add.reduceat``.
+
+    Returns an array of shape ``(n_boot, len(counts))``; `counts` must be
+    positive.
+    """
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    owner = np.repeat(np.arange(len(counts)), counts)
+    row_starts, row_counts = starts[owner], counts[owner].astype(float)
+    n_rows = len(values)
+
+    # Row ranges of similar sizes, and as many resamples per chunk as fit with one range
+    n_ranges = -(-n_rows // max_draws)
+    edges = np.linspace(0, n_rows, n_ranges + 1).astype(np.intp)
+    per_chunk = max(max_draws // int(np.diff(edges).max()), 1)
+    chunks = [(b, min(b + per_chunk, n_boot)) for b in range(0, n_boot, per_chunk)]
+    streams = rng.spawn(len(chunks))
+
+    def run(first, last):
+        # Means of chunks first..last-1, reusing one set of buffers for all of them
+        draws = np.empty((per_chunk, int(np.diff(edges).max())))
+        rows = np.empty(draws.shape, dtype=np.intp)
+        gathered = np.empty(draws.shape)
+        means = []
+        for (b0, b1), stream in zip(chunks[first:last], streams[first:last]):
+            sums = np.zeros((b1 - b0, len(counts)))
+            for r0, r1 in zip(edges[:-1], edges[1:]):
+                tile = (slice(0, b1 - b0), slice(0, r1 - r0))
+                # floor(u * n) < n for every u < 1 in double precision, so no draw leaves its group
+                stream.random(out=draws[tile])
+                np.multiply(draws[tile], row_counts[r0:r1], out=draws[tile])
+                np.copyto(rows[tile], draws[tile], casting="unsafe")
+                np.add(rows[tile], row_starts[r0:r1], out=rows[tile])
+                np.take(values, rows[tile], out=gathered[tile])
+
+                # Groups overlapping this row range, with their first row inside it
+                c0, c1 = owner[r0], owner[r1 - 1] + 1
+                sums[:, c0:c1] += np.add.reduceat(gathered[tile], np.maximum(starts[c0:c1], r0) - r0, axis=1)
+            means.append(sums / counts)
+        return means
+
+    # Each thread takes a run of consecutive chunks
+    n_workers = min(n_workers, len(chunks))
+    runs = np.linspace(0, len(chunks), n_workers + 1).astype(np.intp)
+    if n_workers == 1:
+        return np.vstack(run(0, len(chunks)))
+    with ThreadPoolExecutor(n_workers) as pool:
+        return np.vstack([means for part in pool.map(run, runs[:-1], runs[1:]) for means in part])
+
+
+def _resample_weighted_means(data, weights, n_boot, rng, max_draws):
+    """
+    Means of `n_boot` resamples of `data` under frequency `weights`
+    """
+    total = weights.sum()
+    n = max(int(round(total)), 1)
+    means = np.empty(n_boot)
+    per_chunk = max(max_draws // len(data), 1)
+    for b in range(0, n_boot, per_chunk):
+        # Number of times each row is drawn in each resample
+        repeats = rng.multinomial(n, weights / total, size=min(per_chunk, n_boot - b))
+        means[b : b + len(repeats)] = repeats @ data / n
+    return means
+
+
+def _draw_point(ax, positions, means, errors, color, alpha=None, **kwargs):
+    """
+    Draw error bars around the means of the point layer
+
+    `errors` holds the distances from each mean down to the lower and up to
+    the upper bound of its interval, as rows, like ``yerr`` of
+    `Axes.errorbar`.
+    """
+    kwargs.setdefault("zorder", 29)
+    return ax.errorbar(positions, means, yerr=errors, fmt="none", ecolor=color, alpha=alpha, **kwargs)
+
+
+# Function to explicitly set labels for plot elements
+def _add_legend_data(ax, handle, label):
+    """
+    Function to explicitly set labels for plot elements
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axis to add legend to
+    handle : object
+        Handle to add to the legend
+    label : str
+        Label to display in the legend
+    """
+    # Simply set the label for the handle
+    handle.set_label(label)
+
+    # The legend will be created later with ax.legend()
+
+
+# Function to apply Nature style guidelines
+def apply_nature_style(fig=None, ax=None, font_size=8):
+    """
+    Apply Nature journal style guidelines to the plot
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure, optional
+        Figure to apply style to
+    ax : matplotlib.axes.Axes, optional
+        Axis to apply style to
+    font_size : int, optional
+        Font size to use (default: 8)
+    """
+    if fig is not None:
+        # Set figure size to Nature guidelines
+        fig.set_size_inches(3.5, 2.625)  # 89 mm x 66.7 mm
+
+    if ax is not None:
+        # Set font sizes
+        ax.title.set_fontsize(font_size)
+        ax.xaxis.label.set_fontsize(font_size)
+        ax.yaxis.label.set_fontsize(font_size)
+
+        # Set tick parameters
+        ax.tick_params(axis="both", which="major", labelsize=font_size - 1)
+
+        # Set spines
         ax.spines["right"].set_visible(False)
         ax.spines["top"].set_visible(False)
 
         # Set legend
         if ax.get_legend() is not None:
             ax.legend(fontsize=font_size - 1, frameon=False)
+
+
+def render_rainclouds(jobs, out_dir, data=None, workers=None, fmt="png", dpi=300, style=True, on_result=None):
+    """
+    Render many raincloud figures to files on a pool of processes
+
+    The workers draw with the non-interactive Agg backend. `data` is placed
+    in shared memory once and attached by every worker, instead of being
+    pickled for each job; text columns are shared as integer codes.
+
+    Parameters
+    ----------
+    jobs : iterable of dict
+        One figure each. "name" (required) is the output file name without
+        extension; "where" optionally maps columns of `data` to the value
+        that the rows of this figure must have; "data" gives the job its own
+        (small) DataFrame instead; "figsize" sets the figure size. All other
+        keys are passed to `RainCloud`.
+    out_dir : str
+        Directory to write the figures to; created if needed.
+    data : DataFrame
+        Long-form dataset shared by all jobs.
+    workers : int
+        Number of processes (default: one per CPU). With 1 the jobs run in
+        the calling process.
+    fmt : str
+        File format passed to `Figure.savefig`.
+    dpi : float
+        Resolution of raster formats.
+    style : bool
+        Whether to apply `apply_nature_style` to every figure.
+    on_result : callable
+        Called with each job's report row as soon as the job finishes.
+
+    Returns
+    -------
+    report : DataFrame
+        One row per job, in job order, with its "name", output "path",
+        wall-clock "seconds" and "error" (None, or the formatted traceback).
+        A failing job does not stop the others.
+    """
+    jobs = list(jobs)
+    os.makedirs(out_dir, exist_ok=True)
+    options = (out_dir, fmt, dpi, style)
+
+    results = [None] * len(jobs)
+
+    def collect(i, result):
+        results[i] = result
+        if on_result is not None:
+            on_result(result)
+
+    if workers == 1:
+        for i, job in enumerate(jobs):
+            collect(i, _render_job(job, data, *options))
+        return pd.DataFrame(results, columns=["name", "path", "seconds", "error"])
+
+    shared = None if data is None else _SharedFrame(data)
+    try:
+        with process.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(None if shared is None else shared.columns,),
+        ) as pool:
+            futures = {pool.submit(_render_shared_job, job, *options): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+    finally:
+        if shared is not None:
+            shared.close()
+
+    return pd.DataFrame(results, columns=["name", "path", "seconds", "error"])
+
+
+class _SharedFrame:
+    """
+    Columns of a DataFrame copied into shared memory blocks
+
+    `columns` describes them as picklable ``(name, block, dtype, length,
+    levels)`` tuples for `_attach_frame`, where `levels` holds the categories
+    of columns shared as codes.
+    """
+
+    def __init__(self, frame):
+        self.blocks, self.columns = [], []
+        for name, column in frame.items():
+            levels = None
+            if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufcmM":
+                values = column.to_numpy()
+            else:
+                values, levels = pd.factorize(column)
+
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, values.dtype, buffer=block.buf)[:] = values
+            self.blocks.append(block)
+            self.columns.append((name, block.name, values.dtype.str, len(values), levels))
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach_frame(columns):
+    """
+    DataFrame viewing the shared blocks described by `columns`, and the blocks
+    """
+    blocks, frame = [], {}
+    for name, block_name, dtype, length, levels in columns:
+        block = shared_memory.SharedMemory(name=block_name)
+        values = np.ndarray((length,), np.dtype(dtype), buffer=block.buf)
+        frame[name] = values if levels is None else pd.Categorical.from_codes(values, levels)
+        blocks.append(block)
+    return pd.DataFrame(frame, copy=False), blocks
+
+
+# Data attached by each render worker process
+_worker_data = None
+_worker_blocks = []
+
+
+def _init_render_worker(columns):
+    global _worker_data, _worker_blocks
+    plt.switch_backend("agg")
+    if columns is not None:
+        _worker_data, _worker_blocks = _attach_frame(columns)
+
+
+def _render_shared_job(job, out_dir, fmt, dpi, style):
+    return _render_job(job, _worker_data, out_dir, fmt, dpi, style)
+
+
+class RainCloudRenderer:
+    """
+    Draw many RainCloud panels on a pool of reused figures, outside pyplot
+
+    Figures are built directly from `matplotlib.figure.Figure`, so pyplot
+    never registers them, and are kept in a small pool keyed by size. Each
+    panel reuses the axis of its size after removing the previous panel's
+    artists, title, labels and legend, which is far cheaper than building a
+    new figure or `Axes.clear` and keeps memory flat over thousands of
+    panels. Panels are written as pages of one PDF or as files in a
+    directory.
+
+    Parameters
+    ----------
+    out : str, optional
+        A path ending in ".pdf" collects every panel as a page of one
+        document; any other path is a directory receiving one file per
+        panel. Without `out` the panels are not saved.
+    fmt : str
+        File format of the panels written to a directory.
+    dpi : int
+        Resolution of the saved panels.
+    figsize : tuple
+        Default panel size in inches; the Nature size of
+        `apply_nature_style` with `style`, otherwise (6, 4).
+    style : bool
+        Whether to apply the fonts and spines of `apply_nature_style`.
+    pool_size : int
+        Number of figures of different sizes kept for reuse.
+
+    Examples
+    --------
+    >>> with RainCloudRenderer("report.pdf") as renderer:
+    ...     for subject, frame in df.groupby("subject"):
+    ...         renderer.draw(x="group", y="value", data=frame, title=subject)
+    """
+
+    def __init__(self, out=None, fmt="png", dpi=300, figsize=None, style=True, pool_size=4):
+        self.out, self.fmt, self.dpi, self.style, self.pool_size = out, fmt, dpi, style, pool_size
+        self.figsize = figsize if figsize is not None else (3.5, 2.625) if style else (6, 4)
+        self.n_panels = 0
+        self._pool = OrderedDict()
+        self._pages = None
+        if out is not None and out.lower().endswith(".pdf"):
+            self._pages = backend_pdf.PdfPages(out)
+        elif out is not None:
+            os.makedirs(out, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def axes(self, figsize=None):
+        """
+        Emptied axis of a pooled figure of `figsize`, created on first use
+        """
+        figsize = tuple(self.figsize if figsize is None else figsize)
+        if figsize in self._pool:
+            self._pool.move_to_end(figsize)
+            ax = self._pool[figsize]
+            _reset_axes(ax)
+            return ax
+
+        ax = mfigure.Figure(figsize=figsize).add_subplot()
+        self._pool[figsize] = ax
+        if len(self._pool) > self.pool_size:
+            self._pool.popitem(last=False)
+        return ax
+
+    def draw(self, name=None, title=None, figsize=None, **kwargs):
+        """
+        Draw one panel with `RainCloud` and write it out
+
+        `kwargs` go to `RainCloud`. Panels written to a directory are named
+        `name`, by default after their number.
+
+        Returns
+        -------
+        result : str or int or matplotlib axis
+            Path of the panel's file, its page number in the PDF, or the
+            axis without `out`. The axis is reused by the next panel of the
+            same size.
+        """
+        ax = self.axes(figsize)
+        RainCloud(ax=ax, **kwargs)
+        if title is not None:
+            ax.set_title(title)
+        if self.style:
+            apply_nature_style(ax=ax)
+        self.n_panels += 1
+
+        if self._pages is not None:
+            self._pages.savefig(ax.figure, dpi=self.dpi)
+            return self._pages.get_pagecount()
+        if self.out is not None:
+            path = os.path.join(self.out, f"{name or f'panel_{self.n_panels:05d}'}.{self.fmt}")
+            ax.figure.savefig(path, format=self.fmt, dpi=self.dpi)
+            return path
+        return ax
+
+    def close(self):
+        """
+        Finish the PDF, if any, and release the pooled figures
+        """
+        if self._pages is not None:
+            self._pages.close()
+            self._pages = None
+        self._pool.clear()
+
+
+def _reset_axes(ax):
+    """
+    Remove what a RainCloud call adds to an axis and restore autoscaling
+    """
+    for artists in (ax.artists, ax.collections, ax.images, ax.lines, ax.patches, ax.tables, ax.texts):
+        for artist in list(artists):
+            artist.remove()
+    # Containers (e.g. of error bars) would keep the removed artists alive
+    ax.containers.clear()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.set_title("")
+    ax.set_xlabel("")
+    ax.set_ylabel("")
+    ax.relim()
+    ax.set_autoscale_on(True)
+
+
+def _render_job(job, data, out_dir, fmt, dpi, style):
+    """
+    Draw and save one figure of `render_rainclouds`, returning its report row
+    """
+    start = time.perf_counter()
+    kwargs = dict(job)
+    name = kwargs.pop("name")
+    path = os.path.join(out_dir, f"{name}.{fmt}")
+    error = None
+    try:
+        frame = kwargs.pop("data", data)
+        where = kwargs.pop("where", None)
+        if where:
+            mask = np.ones(len(frame), dtype=bool)
+            for column, value in where.items():
+                mask &= (frame[column] == value).to_numpy()
+            frame = frame[mask]
+
+        fig, ax = plt.subplots(figsize=kwargs.pop("figsize", (6, 4)))
+        try:
+            RainCloud(data=frame, ax=ax, **kwargs)
+            if style:
+                apply_nature_style(fig, ax)
+            fig.savefig(path, format=fmt, dpi=dpi)
+        finally:
+            plt.close(fig)
+    except Exception:
+        error = traceback.format_exc()
+
+    return {"name": name, "path": path, "seconds": time.perf_counter() - start, "error": error}
+
+
+class FigureCache:
+    """
+    On-disk cache of rendered RainCloud figures, addressed by content
+
+    The key hashes the data buffers, every `RainCloud` argument, the output
+    options, the active rcParams (so styles set by e.g. ``configure_plots``
+    count) and the versions of the plotting stack. A hit returns the stored
+    file without plotting. Files are evicted least recently used first once
+    the directory exceeds `max_bytes`, except the file just rendered, which
+    is kept even if it alone exceeds the bound.
+
+    Rendering is only reproducible with a fixed `random_state`; without one
+    a hit returns the jitter of the first rendering.
+
+    Parameters
+    ----------
+    directory : str
+        Where the files are kept; created if needed.
+    max_bytes : int
+        Size bound of the cached files.
+
+    Examples
+    --------
+    >>> cache = FigureCache("~/.cache/rainclouds")
+    >>> path = cache.render(x="group", y="value", data=df, random_state=0, fmt="pdf")
+    """
+
+    def __init__(self, directory, max_bytes=2**30):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, fmt="png", dpi=None, figsize=None, style=False, **kwargs):
+        """
+        Content hash of a `render` call
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        versions = (mpl.__version__, np.__version__, pd.__version__, sns.__version__, _source_digest())
+        digest.update(repr((fmt, dpi, figsize, style, versions)).encode())
+        digest.update(repr(sorted(mpl.rcParams.items())).encode())
+        for name, value in sorted(kwargs.items()):
+            digest.update(name.encode())
+            _hash_value(digest, value)
+        return digest.hexdigest()
+
+    def render(self, fmt="png", dpi=None, figsize=None, style=False, out=None, **kwargs):
+        """
+        Path of the rendered figure, plotting it only on a cache miss
+
+        `kwargs` go to `RainCloud`; `style` applies `apply_nature_style`. With
+        `out` the file is also copied there, and `out` is returned.
+        """
+        path = os.path.join(self.directory, f"{self.key(fmt, dpi, figsize, style, **kwargs)}.{fmt}")
+        if os.path.exists(path):
+            self.hits += 1
+            # Refresh the access time that drives eviction
+            os.utime(path)
+        else:
+            self.misses += 1
+            fig, ax = plt.subplots(figsize=figsize)
+            try:
+                RainCloud(ax=ax, **kwargs)
+                if style:
+                    apply_nature_style(fig, ax)
+                # Write atomically so that concurrent readers never see partial files
+                partial = f"{path}.{os.getpid()}.partial"
+                fig.savefig(partial, format=fmt, dpi="figure" if dpi is None else dpi)
+                os.replace(partial, path)
+            finally:
+                plt.close(fig)
+            # The new file stays even if it alone exceeds the bound
+            self._evict(keep=path)
+
+        if out is None:
+            return path
+        shutil.copyfile(path, out)
+        return out
+
+    def _files(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".partial"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _evict(self, keep=None):
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+
+    def info(self):
+        """
+        Hits, misses, size bound and current size and number of cached files
+        """
+        files = self._files()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_bytes": self.max_bytes,
+            "currbytes": sum(size for _, size, _ in files),
+            "currsize": len(files),
+        }
+
+    def clear(self):
+        """
+        Delete every cached file and reset the hit and miss counters
+        """
+        for _, _, path in self._files():
+            os.remove(path)
+        self.hits = self.misses = 0
+
+
+# Lists and tuples up to this length are hashed by their repr
+_HASH_REPR_ITEMS = 8
+
+
+def _hash_value(digest, value):
+    """
+    Feed the content of an argument (frames and arrays by their buffers) to `digest`
+
+    Every input format `RainCloud` accepts is hashed column by column through
+    `_column`; nothing long is hashed by its repr, which NumPy and the table
+    libraries truncate.
+    """
+    library = type(value).__module__.partition(".")[0]
+    if library in ("pyarrow", "polars") and hasattr(value, "columns"):
+        names = list(value.column_names if library == "pyarrow" else value.columns)
+        digest.update(repr((library, value.shape, names)).encode())
+        for name in names:
+            _hash_value(digest, _column(value, name))
+    elif isinstance(value, Mapping):
+        digest.update(f"mapping{len(value)}".encode())
+        for name, column in value.items():
+            _hash_value(digest, name)
+            _hash_value(digest, column)
+    elif isinstance(value, np.ndarray) and value.dtype.names is not None:
+        digest.update(repr((value.shape, value.dtype.names)).encode())
+        for name in value.dtype.names:
+            _hash_value(digest, value[name])
+    elif isinstance(value, (pd.Index, pd.api.extensions.ExtensionArray)) or (
+        isinstance(value, np.ndarray) and value.dtype == object
+    ):
+        digest.update(f"{type(value).__name__}{np.shape(value)}".encode())
+        _hash_value(digest, pd.Series(value.ravel() if isinstance(value, np.ndarray) else value, copy=False))
+    elif isinstance(value, (list, tuple)) and len(value) > _HASH_REPR_ITEMS:
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _hash_value(digest, item)
+    elif isinstance(value, pd.DataFrame):
+        digest.update(repr((value.shape, list(value.columns))).encode())
+        for _, column in value.items():
+            _hash_value(digest, column)
+    elif isinstance(value, pd.Series):
+        if isinstance(value.dtype, np.dtype) and value.dtype.kind in "biufcmM":
+            _hash_value(digest, value.to_numpy())
+        else:
+            # Text and categories hash row by row; array cells (summaries) by content
+            try:
+                _hash_value(digest, pd.util.hash_pandas_object(value, index=False).to_numpy())
+            except TypeError:
+                for item in value:
+                    _hash_value(digest, item)
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        value = np.ascontiguousarray(value)
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        digest.update(value.data)
+    elif isinstance(value, np.random.Generator):
+        digest.update(repr(value.bit_generator.state).encode())
+    else:
+        digest.update(repr(value).encode())
+
+
+def _source_digest():
+    """
+    Hash of this module's source, so that cached figures follow code changes
+    """
+    global _SOURCE_DIGEST
+    if _SOURCE_DIGEST is None:
+        with open(__file__, "rb") as source:
+            _SOURCE_DIGEST = hashlib.blake2b(source.read(), digest_size=8).hexdigest()
+    return _SOURCE_DIGEST
+
+
+_SOURCE_DIGEST = None
@@ -1,10 +1,12 @@
 # shared/src/plotting/styles.py の改善案
 import matplotlib.pyplot as plt
-from scienceplots import plt as sp_plt
 
 
 def configure_plots(style="nature", font_size=5):
     """configuration of plot style and font size"""
+    # scienceplots registers the "science" styles on import; only load it when they are used
+    import scienceplots  # noqa: F401
+
     plt.style.use(
         [
             "science",
@@ -0,0 +1,472 @@
+"""
+test_raincloud_modern.py
+
+Checks of the accuracy, equivalence and reproducibility guarantees that
+raincloud_modern documents for its statistics, rendering and caching
+"""
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+from matplotlib.collections import PathCollection, PolyCollection  # noqa: E402
+from scipy import stats  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import raincloud_modern as rc  # noqa: E402
+
+# Standard normal density at 0 and at the kernel truncation radius
+PHI_0 = 1 / np.sqrt(2 * np.pi)
+PHI_TRUNCATE = np.exp(-0.5 * rc._KDE_TRUNCATE**2) / np.sqrt(2 * np.pi)
+
+# Statistics compared between two ways of computing a summary
+SUMMARY_SCALARS = ["n", "mean", "sem", "q1", "med", "q3", "whislo", "whishi"]
+
+
+def binned_error_bound(data, support, bandwidth, engine):
+    """
+    Largest difference from the exact KDE documented in `_kde_binned`
+    """
+    lo, hi = min(support[0], data.min()), max(support[-1], data.max())
+    n_bins = int(np.clip(np.ceil((hi - lo) / bandwidth * rc._KDE_BINS_PER_BW) + 1, len(support), rc._KDE_MAX_BINS))
+    delta = (hi - lo) / (n_bins - 1)
+    bound = delta**2 * PHI_0 / (4 * bandwidth**3)
+    if engine == "binned":
+        bound += PHI_TRUNCATE / bandwidth
+    return bound
+
+
+def make_groups(seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.normal(size=500),
+        rng.normal(3, 0.2, size=50),
+        np.concatenate([rng.normal(-2, 0.5, 300), rng.normal(2, 1, 700)]),
+        rng.exponential(size=2000),
+    ]
+
+
+@pytest.mark.parametrize("engine", ["binned", "fft"])
+@pytest.mark.parametrize("bw", ["scott", "silverman", 0.3])
+def test_binned_engines_within_documented_bound(engine, bw):
+    groups = make_groups()
+    supports, densities = rc.compute_densities(groups, bw=bw, engine=engine)
+    for group, support, density in zip(groups, supports, densities):
+        kde = stats.gaussian_kde(group, bw_method=bw)
+        bandwidth = np.sqrt(kde.covariance[0, 0])
+        error = np.abs(density - kde(support)).max()
+        assert error <= binned_error_bound(group, support, bandwidth, engine)
+
+
+@pytest.mark.parametrize("engine", ["binned", "fft"])
+def test_binned_engines_with_capped_bins(engine):
+    # A narrow body with two far outliers needs more than _KDE_MAX_BINS bins at the usual spacing
+    group = np.concatenate([np.random.default_rng(1).normal(size=300_000), [-1e4, 1e4]])
+    support, density = (row[0] for row in rc.compute_densities([group], engine=engine))
+    kde = stats.gaussian_kde(group)
+    bandwidth = np.sqrt(kde.covariance[0, 0])
+    assert (group.max() - group.min()) / bandwidth * rc._KDE_BINS_PER_BW > rc._KDE_MAX_BINS
+    error = np.abs(density - kde(support)).max()
+    assert error <= binned_error_bound(group, support, bandwidth, engine)
+
+
+def test_exact_engine_matches_gaussian_kde():
+    groups = make_groups()
+    supports, densities = rc.compute_densities(groups)
+    for group, support, density in zip(groups, supports, densities):
+        np.testing.assert_allclose(density, stats.gaussian_kde(group)(support), rtol=1e-10, atol=1e-14)
+
+
+def make_data(n_rows=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, 5, n_rows)
+    hue = rng.integers(0, 2, n_rows)
+    return pd.DataFrame(
+        {
+            "group": np.array(list("ABCDE"))[group],
+            "hue": np.array(["x", "y"])[hue],
+            "value": rng.normal(size=n_rows) * (1 + group) + 0.5 * hue,
+        }
+    )
+
+
+@pytest.mark.parametrize("kde_engine", ["exact", "binned"])
+@pytest.mark.parametrize("box_method", ["exact", "select"])
+def test_threaded_statistics_identical_to_serial(kde_engine, box_method):
+    data = make_data()
+    categories, hue_levels = rc._levels(data, "group"), rc._levels(data, "hue")
+    keys = rc._cell_keys(data, "group", categories, "hue", hue_levels)
+    values = rc._value_column(data, "value")
+    n_cells = len(categories) * len(hue_levels)
+
+    serial = rc._cell_statistics(values, keys, n_cells, engine=kde_engine, box_method=box_method)
+    threaded = rc._cell_statistics(values, keys, n_cells, engine=kde_engine, box_method=box_method, n_jobs=4)
+    for name in ("counts", "values", "bounds", "supports", "densities", "means", "sems"):
+        assert getattr(serial, name).tobytes() == getattr(threaded, name).tobytes(), name
+    for name, array in serial.box.items():
+        assert array.tobytes() == threaded.box[name].tobytes(), name
+
+
+def test_weights_equal_expanded_rows():
+    rng = np.random.default_rng(2)
+    counts = pd.DataFrame(
+        {
+            "group": np.repeat(list("ABC"), 40),
+            "value": np.round(rng.normal(size=120), 1),
+            "n": rng.integers(0, 6, 120),
+        }
+    )
+    expanded = counts.loc[counts.index.repeat(counts["n"])]
+
+    weighted = rc.summarize_raincloud(counts, x="group", y="value", weights="n", rain_sample=0)
+    plain = rc.summarize_raincloud(expanded, x="group", y="value", rain_sample=0)
+    for name in SUMMARY_SCALARS:
+        np.testing.assert_allclose(weighted[name], plain[name], rtol=1e-12, err_msg=name)
+    for a, b in zip(weighted["density"], plain["density"]):
+        np.testing.assert_allclose(a, b, rtol=1e-12)
+
+
+def test_compact_within_float32_precision():
+    # More rows than _COMPACT_CHUNK, so the codes and the partition are built in blocks
+    data = make_data(300_000)
+    default = rc.summarize_raincloud(data, x="group", y="value", hue="hue", rain_sample=0)
+    compact = rc.summarize_raincloud(data, x="group", y="value", hue="hue", rain_sample=0, compact=True)
+    scale = np.abs(data["value"]).max()
+    for name in SUMMARY_SCALARS:
+        np.testing.assert_allclose(compact[name], default[name], rtol=1e-5, atol=1e-6 * scale, err_msg=name)
+    for a, b in zip(compact["density"], default["density"]):
+        np.testing.assert_allclose(a, b, rtol=0, atol=1e-5 * np.max(b))
+
+
+def test_chunked_partition_equals_single_sort():
+    rng = np.random.default_rng(3)
+    keys = rng.integers(-1, 30, 100_003).astype(np.int8)
+    values, weights = rng.normal(size=len(keys)), rng.random(len(keys))
+    whole = rc._partition(values, keys, 30, weights)
+    chunked = rc._partition(values, keys, 30, weights, chunk=1000)
+    for a, b in zip(whole, chunked):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("render", rc.RENDER_MODES)
+def test_raster_rain_is_rasterized(render):
+    data = make_data(2000)
+    ax = rc.RainCloud(x="group", y="value", hue="hue", data=data, rain_mode="raster", render=render, random_state=0)
+    rain = [
+        artist for artist in ax.collections if isinstance(artist, PathCollection) and len(artist.get_offsets()) > 1
+    ]
+    assert rain and all(artist.get_rasterized() for artist in rain)
+    plt.close(ax.figure)
+
+
+def test_missing_values_are_dropped():
+    data = make_data()
+    with_missing = data.copy()
+    with_missing.loc[::7, "value"] = np.nan
+    kept = with_missing.dropna()
+
+    levels = dict(order=list("ABCDE"), hue_order=["x", "y"], rain_sample=0)
+    summary = rc.summarize_raincloud(with_missing, x="group", y="value", hue="hue", **levels)
+    reference = rc.summarize_raincloud(kept, x="group", y="value", hue="hue", **levels)
+    for name in SUMMARY_SCALARS:
+        np.testing.assert_array_equal(summary[name], reference[name], err_msg=name)
+    assert all(np.isfinite(density).all() for density in summary["density"])
+
+    # The streaming accumulator drops them as well
+    accumulator = rc.RainCloudAccumulator(x="group", y="value", hue="hue", order=list("ABCDE"), hue_order=["x", "y"])
+    for start in range(0, len(with_missing), 5000):
+        accumulator.update(with_missing.iloc[start : start + 5000])
+    np.testing.assert_array_equal(accumulator.summary()["n"], summary["n"])
+
+
+@pytest.mark.parametrize("b_values", [[50.0] * 5, [50.0]])
+def test_value_limits_cover_cells_without_violin(b_values):
+    a_values = np.random.default_rng(4).normal(size=500)
+    data = pd.DataFrame({"group": ["A"] * 500 + ["B"] * len(b_values), "value": np.concatenate([a_values, b_values])})
+    ax = rc.RainCloud(x="group", y="value", data=data, random_state=0)
+    low, high = ax.get_ylim()
+    assert low < a_values.min() and high > 50
+    plt.close(ax.figure)
+
+    summary = rc.summarize_raincloud(data, x="group", y="value", rain_sample=0)
+    ax = rc.RainCloud(x="group", y="value", summary=summary)
+    low, high = ax.get_ylim()
+    assert low < a_values.min() and high > 50
+    plt.close(ax.figure)
+
+
+def violin_half_widths(ax):
+    # Violins are the polygons with more vertices than a box
+    widths = []
+    for collection in ax.collections:
+        if isinstance(collection, PolyCollection):
+            for path in collection.get_paths():
+                if len(path.vertices) > 10:
+                    widths.append(np.ptp(path.vertices[:, 0]))
+    return widths
+
+
+@pytest.mark.parametrize("render", rc.RENDER_MODES)
+def test_clipped_violin_keeps_unclipped_width_scale(render):
+    data = pd.DataFrame({"group": "A", "value": np.random.default_rng(5).normal(size=2000)})
+    options = dict(x="group", y="value", data=data, gridsize="auto", render=render)
+
+    fig, ax = plt.subplots()
+    rc.RainCloud(ax=ax, **options)
+    (full,) = violin_half_widths(ax)
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    ax.set_ylim(1.5, 4)
+    rc.RainCloud(ax=ax, **options)
+    (clipped,) = violin_half_widths(ax)
+    plt.close(fig)
+
+    # The widest clipped point is the density at the lower limit
+    kde = stats.gaussian_kde(data["value"])
+    expected = full * kde(1.5)[0] / kde(np.linspace(-4, 4, 4001)).max()
+    np.testing.assert_allclose(clipped, expected, rtol=0.02)
+
+
+@pytest.mark.parametrize("max_bytes", [None, 24 * 700])
+def test_bootstrap_intervals_match_normal_theory(max_bytes):
+    # 24 bytes per draw: 700 draws per chunk split every resample into row ranges across cells
+    rng = np.random.default_rng(6)
+    counts = rng.integers(1, 400, 60)
+    counts[[3, 17]] = 0
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    values = rng.normal(size=bounds[-1])
+
+    options = dict(n_boot=2000, level=95, max_bytes=max_bytes)
+    lo, hi = rc._bootstrap_intervals(values, bounds, rng=np.random.default_rng(0), **options)
+    threaded = rc._bootstrap_intervals(values, bounds, rng=np.random.default_rng(0), n_jobs=3, **options)
+    np.testing.assert_array_equal(lo, threaded[0])
+    np.testing.assert_array_equal(hi, threaded[1])
+
+    assert np.isnan(lo[[3, 17]]).all() and np.isnan(hi[[3, 17]]).all()
+    large = counts >= 100
+    cells = [values[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    means = np.array([cell.mean() if len(cell) else np.nan for cell in cells])
+    sems = np.array([cell.std() / np.sqrt(len(cell)) if len(cell) else np.nan for cell in cells])
+    np.testing.assert_allclose((hi - lo)[large], 2 * 1.96 * sems[large], rtol=0.15)
+    np.testing.assert_allclose(((hi + lo) / 2)[large], means[large], atol=0.2 * sems[large].max())
+
+
+def handle_geometry(handle):
+    # Violin vertices, rain offsets, box outlines and point offsets of every cell, plus the mean lines
+    geometry = {}
+    for k, cell in handle._cells.items():
+        if cell["violin"] is not None and cell["violin"].get_visible():
+            geometry[k, "violin"] = cell["violin"].get_paths()[0].vertices
+        if cell["rain"] is not None:
+            geometry[k, "rain"] = np.asarray(cell["rain"].get_offsets())
+        for name, artists in (cell["box"] or {}).items():
+            for i, artist in enumerate(artists):
+                shape = artist.get_xydata() if hasattr(artist, "get_xydata") else artist.get_path().vertices
+                geometry[k, name, i] = np.asarray(shape)
+        if cell["point"] is not None and cell["point"].get_visible():
+            geometry[k, "point"] = np.asarray(cell["point"].get_offsets())
+    for j, line in handle._mean_lines.items():
+        if line.get_visible():
+            geometry["means", j] = line.get_xydata()
+    return geometry
+
+
+def assert_same_geometry(handle, reference):
+    actual, expected = handle_geometry(handle), handle_geometry(reference)
+    assert actual.keys() == expected.keys()
+    for key, shape in expected.items():
+        np.testing.assert_allclose(actual[key], shape, rtol=1e-12, atol=1e-12, err_msg=str(key))
+
+
+def draw_handle(data):
+    options = dict(order=list("ABCDE"), hue_order=["x", "y"], jitter=False, pointplot=True, connect_means=True)
+    return rc.RainCloud(x="group", y="value", hue="hue", data=data, return_handle=True, **options)
+
+
+def stale_artists(handle):
+    # Drawing leaves the title texts stale, so callers compare against the state after a draw
+    return {id(artist) for artist in handle.ax.get_children() if artist.stale}
+
+
+def test_handle_update_matches_fresh_plot():
+    data = make_data(3000)
+    # The appended rows leave cell (E, y) empty until the update
+    first = data.iloc[:2000]
+    first = first[~((first["group"] == "E") & (first["hue"] == "y"))]
+    rest = data.iloc[2000:]
+
+    handle = draw_handle(first)
+    handle.ax.figure.canvas.draw()
+    stale = stale_artists(handle)
+    changed = handle.update(rest)
+    assert stale_artists(handle) - stale <= {id(artist) for artist in changed}
+
+    reference = draw_handle(pd.concat([first, rest]))
+    assert_same_geometry(handle, reference)
+    handle.rescale()
+    assert handle.ax.get_ylim() == reference.ax.get_ylim()
+    plt.close("all")
+
+
+def test_handle_set_data_matches_fresh_plot():
+    data = make_data(3000)
+    cell = (data["group"] == "B") & (data["hue"] == "x")
+    new_values = np.random.default_rng(7).normal(4, 2, 300)
+    replaced = pd.concat([data[~cell], pd.DataFrame({"group": "B", "hue": "x", "value": new_values})])
+
+    handle = draw_handle(data)
+    handle.ax.figure.canvas.draw()
+    stale = stale_artists(handle)
+    changed = handle.set_data("B", "x", new_values)
+    assert stale_artists(handle) - stale <= {id(artist) for artist in changed}
+
+    assert_same_geometry(handle, draw_handle(replaced))
+    plt.close("all")
+
+
+def accumulate(data, chunk_size, **options):
+    accumulator = rc.RainCloudAccumulator(x="group", y="value", hue="hue", **options)
+    for start in range(0, len(data), chunk_size):
+        accumulator.update(data.iloc[start : start + chunk_size])
+    return accumulator
+
+
+def test_accumulator_moments_match_summary():
+    data = make_data(50_000)
+    levels = dict(order=list("ABCDE"), hue_order=["x", "y"])
+    streamed = accumulate(data, 3000, **levels).summary()
+    reference = rc.summarize_raincloud(data, x="group", y="value", hue="hue", rain_sample=0, **levels)
+    np.testing.assert_array_equal(streamed["n"], reference["n"])
+    for name in ("mean", "sem"):
+        np.testing.assert_allclose(streamed[name], reference[name], rtol=1e-12, err_msg=name)
+
+
+def test_accumulator_quartiles_within_sketch_bound():
+    # A small sketch compacts many times; its rank error stays a small multiple of n / sketch_size
+    sketch_size = 64
+    data = make_data(200_000)
+    levels = dict(order=list("ABCDE"), hue_order=["x", "y"])
+    summary = accumulate(data, 7000, sketch_size=sketch_size, random_state=0, **levels).summary()
+    for _, row in summary.iterrows():
+        cell = (data["group"] == row["group"]) & (data["hue"] == row["hue"])
+        values = np.sort(data.loc[cell, "value"].to_numpy())
+        ranks = np.searchsorted(values, row[["q1", "med", "q3"]].to_numpy(dtype=float)) / len(values)
+        assert np.abs(ranks - [0.25, 0.5, 0.75]).max() <= 4 / sketch_size
+
+
+def test_accumulator_reservoir_is_uniform():
+    n_rows, rain_sample = 100_000, 1000
+    data = pd.DataFrame({"group": "A", "hue": "x", "value": np.arange(n_rows, dtype=float)})
+    tiny = data.iloc[:10]
+
+    sample = accumulate(data, 7000, rain_sample=rain_sample, random_state=0).summary()["rain"][0]
+    assert len(sample) == rain_sample and len(np.unique(sample)) == rain_sample
+    assert len(accumulate(tiny, 3, rain_sample=rain_sample).summary()["rain"][0]) == len(tiny)
+
+    # Every row, whichever chunk it arrived in, is equally likely to be kept
+    assert stats.kstest(sample / n_rows, "uniform").pvalue > 0.01
+    repeat = accumulate(data, 7000, rain_sample=rain_sample, random_state=0).summary()["rain"][0]
+    np.testing.assert_array_equal(sample, repeat)
+
+
+def cached_plot(data, **options):
+    return dict(x="group", y="value", data=data, figsize=(2, 2), dpi=50, random_state=0, **options)
+
+
+def test_figure_cache_counts_hits_and_misses(tmp_path):
+    cache = rc.FigureCache(tmp_path)
+    data = make_data(500)
+    first = cache.render(**cached_plot(data))
+    assert cache.render(**cached_plot(data)) == first
+    cache.render(**cached_plot(data, fmt="svg"))
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["currsize"]) == (1, 2, 2)
+    assert info["currbytes"] == sum(os.path.getsize(path) for path in tmp_path.iterdir())
+
+    cache.clear()
+    assert (cache.hits, cache.misses, cache.info()["currsize"]) == (0, 0, 0)
+
+
+def test_figure_cache_key_follows_inputs(tmp_path):
+    cache = rc.FigureCache(tmp_path)
+    data = make_data(5000)
+    key = cache.key(**cached_plot(data))
+    assert cache.key(**cached_plot(data.copy())) == key
+
+    # One value in the middle of the data, beyond what a repr shows
+    changed = data.copy()
+    changed.loc[2500, "value"] += 1e-9
+    assert cache.key(**cached_plot(changed)) != key
+
+    with matplotlib.rc_context({"lines.linewidth": 3}):
+        assert cache.key(**cached_plot(data)) != key
+
+    generator = np.random.default_rng(0)
+    seeded = cache.key(**dict(cached_plot(data), random_state=generator))
+    assert cache.key(**dict(cached_plot(data), random_state=np.random.default_rng(0))) == seeded
+    generator.random()
+    assert cache.key(**dict(cached_plot(data), random_state=generator)) != seeded
+
+
+def test_figure_cache_evicts_least_recently_used(tmp_path):
+    data = make_data(500)
+    plots = [cached_plot(data[data["hue"] == hue]) for hue in ("x", "y")] + [cached_plot(data)]
+    size_c = os.path.getsize(rc.FigureCache(tmp_path / "sizes").render(**plots[2]))
+
+    cache = rc.FigureCache(tmp_path / "cache")
+    path_a, path_b = cache.render(**plots[0]), cache.render(**plots[1])
+    os.utime(path_a, (1, 1))
+    os.utime(path_b, (2, 2))
+
+    # A hit makes A the most recent, so C pushes out B only
+    cache.render(**plots[0])
+    cache.max_bytes = os.path.getsize(path_a) + size_c
+    path_c = cache.render(**plots[2])
+    assert os.path.exists(path_a) and not os.path.exists(path_b) and os.path.exists(path_c)
+
+    # The file just rendered stays even when it alone exceeds the bound
+    cache.max_bytes = 1
+    path_b = cache.render(**plots[1])
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == [os.path.basename(path_b)]
+
+
+def rendered_pixels(**options):
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=60)
+    rc.RainCloud(ax=ax, **options)
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return pixels
+
+
+@pytest.mark.parametrize("render", rc.RENDER_MODES)
+def test_summary_renders_same_pixels_as_raw_data(render):
+    data = make_data(3000)
+    levels = dict(order=list("ABCDE"), hue_order=["x", "y"])
+    options = dict(x="group", y="value", hue="hue", render=render, random_state=0, pointplot=True, ci="sem", **levels)
+    summary = rc.summarize_raincloud(data, x="group", y="value", hue="hue", **levels)
+    raw = rendered_pixels(data=data, connect_means=True, **options)
+    summarized = rendered_pixels(summary=summary, connect_means=True, **options)
+    np.testing.assert_array_equal(raw, summarized)
+
+
+@pytest.mark.parametrize("render", rc.RENDER_MODES)
+@pytest.mark.parametrize("jitter", [True, "density"])
+def test_seeded_jitter_renders_same_pixels(render, jitter):
+    data = make_data(3000)
+    options = dict(x="group", y="value", hue="hue", data=data, render=render, jitter=jitter)
+    # A budget of 500 rain points makes the subsample random as well as the jitter
+    subsample = dict(rain_mode="subsample", rain_threshold=500)
+    first = rendered_pixels(random_state=0, **subsample, **options)
+    np.testing.assert_array_equal(rendered_pixels(random_state=0, **subsample, **options), first)
+    np.testing.assert_array_equal(rendered_pixels(random_state=np.random.default_rng(0), **subsample, **options), first)
+    assert (rendered_pixels(random_state=1, **subsample, **options) != first).any()